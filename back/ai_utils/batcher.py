@@ -0,0 +1,97 @@
+import asyncio
+from typing import Callable, Optional
+
+
+# Максимальный размер пачки и время ожидания ее заполнения.
+BATCH_MAX = 32
+BATCH_WAIT_MS = 20
+
+# Границы корзин по длине промпта (в символах). Внутри пачки короткие
+# промпты отправляются раньше длинных, чтобы не ждать их за самым долгим.
+LENGTH_BUCKETS = (2000, 8000, 30000)
+
+
+def _bucket(prompt: str) -> int:
+    """Номер корзины по длине промпта."""
+    for i, limit in enumerate(LENGTH_BUCKETS):
+        if len(prompt) <= limit:
+            return i
+    return len(LENGTH_BUCKETS)
+
+
+class LLMBatcher:
+    """Динамическая пачечная отправка запросов к LLM.
+
+    Запросы от параллельных HTTP-запросов собираются в очередь, единственный
+    обработчик забирает их пачками (до BATCH_MAX штук или BATCH_WAIT_MS мс),
+    сортирует по корзинам длины и отправляет одновременно, не более
+    BATCH_MAX запросов к модели в полете.
+    Ollama не умеет принимать несколько промптов в одном вызове, поэтому
+    пачка отправляется параллельными вызовами через общий клиент.
+    """
+
+    def __init__(self, generate: Callable[[str], str]):
+        self._generate = generate
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    def _ensure_worker(self) -> None:
+        """Ленивый запуск обработчика в текущем event loop."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(BATCH_MAX)
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, prompt: str) -> str:
+        """Поставить промпт в очередь и дождаться ответа модели."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((prompt, future))
+        return await future
+
+    async def close(self) -> None:
+        """Остановить обработчик очереди."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect_batch(self) -> list:
+        """Забрать из очереди пачку запросов."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + BATCH_WAIT_MS / 1000
+        while len(batch) < BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            batch.sort(key=lambda job: _bucket(job[0]))
+            for prompt, future in batch:
+                task = asyncio.create_task(self._dispatch(prompt, future))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, prompt: str, future: asyncio.Future) -> None:
+        async with self._semaphore:
+            try:
+                result = await asyncio.to_thread(self._generate, prompt)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+        if not future.done():
+            future.set_result(result)
@@ -1,159 +1,545 @@
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, repeat
+from operator import itemgetter
+from typing import AsyncIterator, Iterator, Optional
+import asyncio
+import hashlib
+import threading
+import httpx
 import pymupdf
 import io
+import os
+import zipfile
+from lxml import etree
 from ollama import Client, GenerateResponse
 from fastapi import UploadFile, File, status, HTTPException
 from docx import Document
-from ..utils import settings
+from ..utils import settings, TTLCache
+from .batcher import LLMBatcher, BATCH_MAX
 
 
+# PDF с меньшим числом страниц разбираются в текущем процессе:
+# накладные расходы на передачу байтов в пул выше выигрыша.
+PDF_PARALLEL_MIN_PAGES = 8
+PDF_POOL_WORKERS = os.cpu_count() or 1
+
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Размер фрагмента текста для одного запроса к LLM и длина хвоста
+# предыдущего фрагмента, передаваемого как контекст.
+MD_CHUNK_SIZE = 30000
+MD_CHUNK_CONTEXT = 500
+TEXT_SEPARATORS = ("\n\n", "\n", ". ", " ", "")
+
+# Кэш извлеченного текста (по хэшу файла) и готового Markdown (по хэшу текста).
+CONVERSION_CACHE_SIZE = 128
+CONVERSION_CACHE_TTL = 3600
+
+MD_SYSTEM_INSTRUCTION = (
+    "Ты — профессиональный редактор технических текстов и конспектов. "
+    "Твоя задача: преобразовать сырой текст из PDF или Word в идеально структурированный Markdown. "
+    "\n\nПРАВИЛА:\n"
+    "1. СОХРАННОСТЬ ДАННЫХ: Запрещено сокращать, резюмировать или выбрасывать части лекции. "
+    "Весь теоретический материал должен быть сохранен.\n"
+    "2. СТРУКТУРА: Используй иерархию заголовков (#, ##, ###), жирный шрифт для терминов и списки.\n"
+    "3. КОД: Все примеры кода оформляй в соответствующие блоки (например, ```java).\n"
+    "4. ТАБУ: Не добавляй от себя приветствия, заключения или комментарии.\n"
+    "5. ЯЗЫК: Сохраняй оригинальный язык текста (русский)."
+)
+MD_PROMPT_PREFIX = "Преобразуй этот текст в Markdown, следуя системным правилам:\n\n"
+
+# Сколько Ollama держит модель загруженной между запросами: системная
+# инструкция одинакова для всех запросов, и ее префикс переиспользуется.
+LLM_KEEP_ALIVE = "10m"
+
+# Если извлеченный текст уже размечен заголовками достаточно плотно,
+# он отдается как есть, без обращения к LLM.
+MD_MIN_HEADINGS = 3
+MD_MAX_CHARS_PER_HEADING = 4000
+
+MD_FILE_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=600"
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Теги и пути, которые проверяются для каждого абзаца/фрагмента текста
+W_VAL = f"{W_NS}val"
+W_RUN = f"{W_NS}r"
+W_TEXT = f"{W_NS}t"
+W_TAB = f"{W_NS}tab"
+W_BREAKS = frozenset({f"{W_NS}br", f"{W_NS}cr"})
+W_RUN_BOLD = f"{W_NS}rPr/{W_NS}b"
+W_PARAGRAPH_STYLE = f"{W_NS}pPr/{W_NS}pStyle"
+W_FALSE_VALUES = frozenset({"0", "false", "off"})
+
+def _extract_pdf_pages(file_bytes: bytes, start: int, stop: int) -> str:
+    """Извлечение текста из диапазона страниц PDF (выполняется в процессе пула)."""
+    with pymupdf.open(stream=file_bytes, filetype="pdf") as doc:
+        return "\n".join(doc[i].get_text() for i in range(start, stop))
+
+
+def _docx_style_names(archive: zipfile.ZipFile) -> dict[str, str]:
+    """Имена стилей DOCX (в нижнем регистре) по их идентификаторам."""
+    try:
+        with archive.open("word/styles.xml") as f:
+            root = etree.parse(f).getroot()
+    except KeyError:
+        return {}
+
+    names = {}
+    for style in root.iter(f"{W_NS}style"):
+        name = style.find(f"{W_NS}name")
+        if name is not None:
+            names[style.get(f"{W_NS}styleId")] = name.get(f"{W_NS}val", "").lower()
+    return names
+
+
+def _docx_run_text(run) -> str:
+    parts = []
+    for child in run:
+        if child.tag == W_TEXT:
+            parts.append(child.text or "")
+        elif child.tag == W_TAB:
+            parts.append("\t")
+        elif child.tag in W_BREAKS:
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _docx_run_bold(run) -> bool:
+    bold = run.find(W_RUN_BOLD)
+    return bold is not None and bold.get(W_VAL, "true") not in W_FALSE_VALUES
+
+
+def _iter_docx_paragraphs(file_bytes: bytes) -> Iterator[tuple[str, list[tuple[bool, str]]]]:
+    """Стиль и фрагменты (жирный, текст) каждого абзаца прямо из XML документа.
+
+    document.xml читается потоково, разобранные абзацы сразу освобождаются.
+    """
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        styles = _docx_style_names(archive)
+        with archive.open("word/document.xml") as f:
+            for _, paragraph in etree.iterparse(f, tag=f"{W_NS}p"):
+                style_id = paragraph.find(W_PARAGRAPH_STYLE)
+                style = ""
+                if style_id is not None:
+                    value = style_id.get(W_VAL, "")
+                    style = styles.get(value, value.lower())
+                runs = [
+                    (_docx_run_bold(run), _docx_run_text(run))
+                    for run in paragraph.iter(W_RUN)
+                ]
+                yield style, runs
+                paragraph.clear()
+
+
+def _iter_docx_paragraphs_fallback(file_bytes: bytes) -> Iterator[tuple[str, list[tuple[bool, str]]]]:
+    """То же через python-docx, если XML не удалось разобрать напрямую."""
+    for paragraph in Document(io.BytesIO(file_bytes)).paragraphs:
+        style = paragraph.style.name.lower() if paragraph.style is not None else ""
+        runs = [(bool(run.bold), run.text) for run in paragraph.runs]
+        yield style, runs or [(False, paragraph.text)]
+
+
+def _docx_paragraph_to_md(style: str, runs: list[tuple[bool, str]]) -> str:
+    """Markdown для абзаца DOCX по его стилю и жирным фрагментам."""
+    text = "".join(chunk for _, chunk in runs)
+    if not text.strip():
+        return ""
+
+    if style == "title":
+        return f"# {text.strip()}"
+    if style.startswith("heading "):
+        level = style.removeprefix("heading ")
+        if level.isdigit():
+            return f"{'#' * min(int(level), 6)} {text.strip()}"
+
+    parts = []
+    for bold, group in groupby(runs, key=itemgetter(0)):
+        chunk = "".join(chunk for _, chunk in group)
+        if bold and chunk.strip():
+            stripped = chunk.strip()
+            lead = chunk[:len(chunk) - len(chunk.lstrip())]
+            trail = chunk[len(chunk.rstrip()):]
+            chunk = f"{lead}**{stripped}**{trail}"
+        parts.append(chunk)
+    text = "".join(parts)
+
+    if style.startswith("list"):
+        return f"- {text.strip()}"
+    return text
+
+
+def _has_markdown_structure(text: str) -> bool:
+    """Достаточно ли в тексте заголовков Markdown, чтобы не звать LLM."""
+    headings = sum(1 for line in text.splitlines() if line.startswith("#") and line.lstrip("#").startswith(" "))
+    return headings >= MD_MIN_HEADINGS and len(text) <= headings * MD_MAX_CHARS_PER_HEADING
+
+
+def _split_recursive(text: str, max_chars: int, separators: tuple[str, ...] = TEXT_SEPARATORS) -> list[str]:
+    """Рекурсивное разбиение текста на фрагменты не длиннее max_chars.
+
+    Сначала текст режется по самому крупному разделителю (абзацы), слишком
+    длинные куски дробятся следующими разделителями вплоть до посимвольного.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    sep, rest = separators[0], separators[1:]
+    if not sep:
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+    parts = text.split(sep)
+    if len(parts) == 1:
+        return _split_recursive(text, max_chars, rest)
+
+    chunks = []
+    current = ""
+    for part in parts:
+        if len(part) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_recursive(part, max_chars, rest))
+            continue
+
+        candidate = f"{current}{sep}{part}" if current else part
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = part
+
+    if current:
+        chunks.append(current)
+    return chunks
 
 
 class ConverterToMd:
     """Конвертатор файлов лекций в md файлы."""
     def __init__(self):
+        # Один клиент на процесс: httpx держит keep-alive соединения к Ollama,
+        # пул рассчитан на все одновременные запросы батчера.
         self.client = Client(
             host="https://ollama.com",
-            headers={'Authorization': 'Bearer ' + settings.OLLAMA_API_KEY}
+            headers={'Authorization': 'Bearer ' + settings.OLLAMA_API_KEY},
+            limits=httpx.Limits(max_connections=BATCH_MAX, max_keepalive_connections=BATCH_MAX)
         )
+        self.pool: Optional[ProcessPoolExecutor] = None
         self.model = settings.LLM_MODEL
+        self._batcher = LLMBatcher(self._generate_md)
+        self._text_cache: TTLCache[str] = TTLCache(CONVERSION_CACHE_SIZE, CONVERSION_CACHE_TTL)
+        self._md_cache: TTLCache[str] = TTLCache(CONVERSION_CACHE_SIZE, CONVERSION_CACHE_TTL)
 
 
     def extract_pdf_raw_text(self, file_bytes: bytes) -> str:
         """Извлечение сырого текста из байтов PDF."""
         try:
             with pymupdf.open(stream=file_bytes, filetype="pdf") as doc:
-                text = ""
-                for page in doc:
-                    text += page.get_text().__str__() + "\n"
-                return text
+                page_count = doc.page_count
+                if page_count < PDF_PARALLEL_MIN_PAGES or self.pool is None:
+                    return "\n".join(page.get_text() for page in doc)
+
+            # Делим страницы на непрерывные диапазоны по числу воркеров,
+            # map сохраняет порядок диапазонов.
+            workers = min(PDF_POOL_WORKERS, page_count)
+            step = -(-page_count // workers)
+            starts = range(0, page_count, step)
+            stops = [min(start + step, page_count) for start in starts]
+            chunks = self.pool.map(_extract_pdf_pages, repeat(file_bytes), starts, stops)
+            return "\n".join(chunks)
         except Exception as e:
             raise RuntimeError(f"Ошибка при чтении PDF: {e}")
 
 
-    def extract_docx_raw_text(self, file_bytes: bytes) -> str:
-        """Извлечение сырого текста из байтов DOCX."""
+    def extract_docx_markdown(self, file_bytes: bytes) -> str:
+        """Извлечение текста из байтов DOCX с разметкой Markdown.
+
+        Стили заголовков и списков, а также жирные фрагменты переносятся
+        в Markdown напрямую.
+        """
         try:
-            file_stream = io.BytesIO(file_bytes)
-            doc = Document(file_stream)
-            full_text = [para.text for para in doc.paragraphs]
-            return "\n".join(full_text)
+            try:
+                paragraphs = [_docx_paragraph_to_md(*p) for p in _iter_docx_paragraphs(file_bytes)]
+            except (KeyError, etree.XMLSyntaxError):
+                paragraphs = [_docx_paragraph_to_md(*p) for p in _iter_docx_paragraphs_fallback(file_bytes)]
+            return "\n\n".join(para for para in paragraphs if para)
         except Exception as e:
             raise RuntimeError(f"Ошибка при чтении DOCX: {e}")
 
 
-    def process_text_to_md(self, raw_text: str) -> str:
+    async def _extract_raw_text(self, filename: str, content: bytes) -> str:
+        """Извлечение текста из PDF/DOCX вне event loop с кэшем по хэшу файла."""
+        key = (filename.endswith(".pdf"), hashlib.blake2b(content).digest())
+        raw_text = self._text_cache.get(key)
+        if raw_text is not None:
+            return raw_text
+
+        raw_text = ""
+        if filename.endswith(".pdf"):
+            raw_text = await asyncio.to_thread(self.extract_pdf_raw_text, content)
+        elif filename.endswith(".docx"):
+            raw_text = await asyncio.to_thread(self.extract_docx_markdown, content)
+
+        self._text_cache.set(key, raw_text)
+        return raw_text
+
+
+    def init(self) -> None:
+        """Создание пула процессов для разбора PDF (вызывается из lifespan).
+
+        Пробная задача запускает воркеры сразу, а не на первом запросе.
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=PDF_POOL_WORKERS)
+            self.pool.submit(int)
+
+
+    async def close(self) -> None:
+        """Остановка очереди запросов к LLM, пула процессов и HTTP-клиента."""
+        await self._batcher.close()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        self.client.close()
+
+
+    def _generate_md(self, user_prompt: str) -> str:
+        """Один синхронный запрос к LLM на преобразование текста в Markdown."""
+        response: GenerateResponse = self.client.generate(
+            model=self.model, 
+            prompt=user_prompt,
+            system=MD_SYSTEM_INSTRUCTION,
+            options={"temperature": 0.1},
+            keep_alive=LLM_KEEP_ALIVE
+        )
+
+        return response.response
+
+
+    async def _stream_md(self, user_prompt: str) -> AsyncIterator[str]:
+        """Потоковый запрос к LLM: токены отдаются по мере генерации.
+
+        Синхронный итератор клиента Ollama читается в отдельном потоке,
+        куски передаются в event loop через очередь.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()
+
+        def produce() -> None:
+            try:
+                for part in self.client.generate(
+                    model=self.model,
+                    prompt=user_prompt,
+                    system=MD_SYSTEM_INSTRUCTION,
+                    options={"temperature": 0.1},
+                    keep_alive=LLM_KEEP_ALIVE,
+                    stream=True
+                ):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, part.response)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = asyncio.create_task(asyncio.to_thread(produce))
+        try:
+            while (item := await queue.get()) is not done:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Клиент мог отключиться: останавливаем чтение ответа модели.
+            stop.set()
+            await producer
+
+
+    async def stream_text_to_md(self, raw_text: str) -> AsyncIterator[str]:
+        """Преобразование текста в Markdown с отдачей результата по частям."""
+        if not raw_text.strip():
+            yield "Не удалось извлечь текст из файла."
+            return
+
+        if _has_markdown_structure(raw_text):
+            yield raw_text
+            return
+
+        key = self._md_cache_key(raw_text)
+        md_text = self._md_cache.get(key)
+        if md_text is not None:
+            yield md_text
+            return
+
+        parts = []
+        if len(raw_text) <= MD_CHUNK_SIZE:
+            async for part in self._stream_md(self._md_prompt(raw_text)):
+                parts.append(part)
+                yield part
+        else:
+            # Фрагменты конвертируются параллельно, а отдаются по порядку,
+            # как только готов очередной.
+            tasks = [
+                asyncio.ensure_future(self._batcher.submit(prompt))
+                for prompt in self._md_chunk_prompts(raw_text)
+            ]
+            try:
+                for i, task in enumerate(tasks):
+                    part = await task if not i else "\n\n" + await task
+                    parts.append(part)
+                    yield part
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        self._md_cache.set(key, "".join(parts))
+
+
+    def _md_cache_key(self, raw_text: str) -> bytes:
+        return hashlib.blake2b(f"{self.model}\0{raw_text}".encode("utf-8")).digest()
+
+
+    def _md_prompt(self, raw_text: str) -> str:
+        return "".join((MD_PROMPT_PREFIX, raw_text))
+
+
+    def _md_chunk_prompts(self, raw_text: str) -> list[str]:
+        """Промпты для длинной лекции, разрезанной на фрагменты.
+
+        Хвост предыдущего фрагмента передается только как контекст,
+        чтобы он не дублировался в итоговом Markdown.
+        """
+        chunks = _split_recursive(raw_text, MD_CHUNK_SIZE)
+        prompts = []
+        for i, chunk in enumerate(chunks):
+            context = chunks[i - 1][-MD_CHUNK_CONTEXT:] if i else ""
+            prompts.append(
+                f"Это фрагмент {i + 1} из {len(chunks)} одной лекции. "
+                f"Преобразуй в Markdown только текст фрагмента, следуя системным правилам.\n\n"
+                + (f"КОНТЕКСТ (конец предыдущего фрагмента, не преобразовывать):\n{context}\n\n" if context else "")
+                + f"ФРАГМЕНТ:\n{chunk}"
+            )
+        return prompts
+
+
+    async def process_text_to_md(self, raw_text: str) -> str:
         """Преобразование текста в Markdown через LLM."""
         
         if not raw_text.strip():
             return "Не удалось извлечь текст из файла."
 
-        if len(raw_text) <= 50000:
-            system_instruction = (
-                "Ты — профессиональный редактор технических текстов и конспектов. "
-                "Твоя задача: преобразовать сырой текст из PDF или Word в идеально структурированный Markdown. "
-                "\n\nПРАВИЛА:\n"
-                "1. СОХРАННОСТЬ ДАННЫХ: Запрещено сокращать, резюмировать или выбрасывать части лекции. "
-                "Весь теоретический материал должен быть сохранен.\n"
-                "2. СТРУКТУРА: Используй иерархию заголовков (#, ##, ###), жирный шрифт для терминов и списки.\n"
-                "3. КОД: Все примеры кода оформляй в соответствующие блоки (например, ```java).\n"
-                "4. ТАБУ: Не добавляй от себя приветствия, заключения или комментарии.\n"
-                "5. ЯЗЫК: Сохраняй оригинальный язык текста (русский)."
-            )
+        if _has_markdown_structure(raw_text):
+            return raw_text
 
-            user_prompt = f"Преобразуй этот текст в Markdown, следуя системным правилам:\n\n{raw_text}"
+        key = self._md_cache_key(raw_text)
+        md_text = self._md_cache.get(key)
+        if md_text is None:
+            md_text = await self._convert_text_to_md(raw_text)
+            self._md_cache.set(key, md_text)
+        return md_text
 
-            response: GenerateResponse = self.client.generate(
-                model=self.model, 
-                prompt=user_prompt,
-                system=system_instruction,
-                options={"temperature": 0.1}
-            )
 
-            return response.response
-        else:
-            raise RuntimeError("Пока что я могу обрабатывать только тексты до 50 000 символов :(")
+    async def _convert_text_to_md(self, raw_text: str) -> str:
+        """Вызов LLM для текста целиком или по фрагментам."""
+        if len(raw_text) <= MD_CHUNK_SIZE:
+            return await self._batcher.submit(self._md_prompt(raw_text))
+
+        results = await asyncio.gather(
+            *(self._batcher.submit(prompt) for prompt in self._md_chunk_prompts(raw_text))
+        )
+        return "\n\n".join(results)
     
 
-    async def convert_as_md_file(self, file: UploadFile = File(...)):
-        """Главный метод конвертации файла лекции в md формат."""
-        
+    async def _read_lecture(self, file: UploadFile) -> tuple[str, bytes]:
+        """Проверка формата и размера файла лекции и чтение его содержимого.
+
+        Заведомо большие файлы отклоняются по заявленному размеру до чтения,
+        остальные читаются кусками с прерыванием при превышении лимита.
+        """
         filename = file.filename.lower() if file.filename else ""
         if not (filename.endswith(".pdf") or filename.endswith(".docx")):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Неподдерживаемый формат файла. Пожалуйста, загружайте файлы в формате PDF или DOCX."
             )
-        
-        MAX_SIZE = 16 * 1024 * 1024
-        
-        content = await file.read()
-        
-        if len(content) > MAX_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Размер файла превышает 16 МБ."
-            )
 
-        
-        try:
-            raw_text = ""
-            if filename.endswith(".pdf"):
-                raw_text = self.extract_pdf_raw_text(content)
-            elif filename.endswith(".docx"):
-                raw_text = self.extract_docx_raw_text(content)
-            
-            md_result = self.process_text_to_md(raw_text)
-            
-            file_stream = io.BytesIO(md_result.encode('utf-8'))
-
-
-            return StreamingResponse(
-                file_stream,
-                media_type="text/markdown",
-                headers={
-                    "Content-Disposition": f"attachment; filename=\"{"lecture"}\""
-                }
-            )
+        too_large = HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail="Размер файла превышает 16 МБ."
+        )
+        if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+            raise too_large
+
+        chunks = []
+        total = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > MAX_UPLOAD_SIZE:
+                raise too_large
+            chunks.append(chunk)
+        return filename, b"".join(chunks)
+
 
+    async def _extract_markdown_source(self, filename: str, content: bytes) -> str:
+        """Извлечение текста лекции с ошибкой 500 при сбое разбора."""
+        try:
+            return await self._extract_raw_text(filename, content)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e)
             )
 
+
+    async def convert_as_md_file(self, file: UploadFile = File(...), if_none_match: str | None = None):
+        """Главный метод конвертации файла лекции в md формат.
+
+        ETag считается по содержимому загруженного файла и модели, поэтому
+        повторная загрузка той же лекции с If-None-Match отдает 304 без
+        извлечения текста и обращения к LLM.
+        """
+        filename, content = await self._read_lecture(file)
+
+        digest = hashlib.blake2b(content, digest_size=8)
+        digest.update(self.model.encode("utf-8"))
+        etag = f'"{digest.hexdigest()}"'
+        cache_headers = {
+            "ETag": etag,
+            "Cache-Control": MD_FILE_CACHE_CONTROL,
+            "Vary": "Accept",
+        }
+
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        ):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+        raw_text = await self._extract_markdown_source(filename, content)
+
+        async def md_stream():
+            async for part in self.stream_text_to_md(raw_text):
+                yield part.encode("utf-8")
+
+        return StreamingResponse(
+            md_stream(),
+            media_type="text/markdown",
+            headers={
+                **cache_headers,
+                "Content-Disposition": 'attachment; filename="lecture.md"'
+            }
+        )
+
     async def convert_as_md_text(self, file: UploadFile = File(...)):
-        """Главный метод конвертации файла лекции в md формат."""
-        
-        filename = file.filename.lower() if file.filename else ""
-        if not (filename.endswith(".pdf") or filename.endswith(".docx")):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Неподдерживаемый формат файла. Пожалуйста, загружайте файлы в формате PDF или DOCX."
-            )
-        
-        MAX_SIZE = 16 * 1024 * 1024
-        
-        content = await file.read()
-        
-        if len(content) > MAX_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Размер файла превышает 16 МБ."
-            )
+        """Конвертация файла лекции в md, результат возвращается строкой."""
+        filename, content = await self._read_lecture(file)
+        raw_text = await self._extract_markdown_source(filename, content)
 
-        
         try:
-            raw_text = ""
-            if filename.endswith(".pdf"):
-                raw_text = self.extract_pdf_raw_text(content)
-            elif filename.endswith(".docx"):
-                raw_text = self.extract_docx_raw_text(content)
-            
-            md_text_of_lecture = self.process_text_to_md(raw_text)
-            
-            return md_text_of_lecture
-
+            return await self.process_text_to_md(raw_text)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
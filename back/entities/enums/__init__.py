@@ -1,8 +1,9 @@
-from .enums import UserRole, OAuthProvider, LessonType, AnswerStatus
+from .enums import UserRole, OAuthProvider, LessonType, AnswerStatus, UploadStatus
 
 __all__ = [
     "UserRole",
     "OAuthProvider",
     "LessonType",
-    "AnswerStatus"
+    "AnswerStatus",
+    "UploadStatus"
 ]
\ No newline at end of file
@@ -1,23 +1,34 @@
-from enum import Enum
+from enum import Enum, unique
 
+@unique
 class UserRole(str, Enum):
     STUDENT = "student"
     TEACHER = "teacher"
     ADMIN = "admin"
 
 
+@unique
 class OAuthProvider(str, Enum):
     GOOGLE = "google"
     GITHUB = "github"
     LOCAL = "local"
 
 
+@unique
 class LessonType(str, Enum):
     LECTURE = "LECTURE"
     PRACTICE = "PRACTICE"
     LAB = "LAB"
 
+@unique
 class AnswerStatus(str, Enum):
     SUBMITTED = "SUBMITTED"  # Отправлено на проверку
     GRADED = "GRADED"        # Оценено
-    RETURNED = "RETURNED"  
\ No newline at end of file
+    RETURNED = "RETURNED"  
+
+
+@unique
+class UploadStatus(str, Enum):
+    PENDING = "PENDING"  # Файлы загружаются в фоне
+    READY = "READY"      # Все файлы загружены
+    FAILED = "FAILED"    # Фоновая загрузка не удалась
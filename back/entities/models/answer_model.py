@@ -1,6 +1,6 @@
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Text,
-    ForeignKey, Enum as SQLEnum, CheckConstraint
+    Column, Integer, DateTime, Text,
+    ForeignKey, Enum as SQLEnum, CheckConstraint, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -11,6 +11,11 @@ from ..enums import AnswerStatus
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (
+        # Студент может отправить только один ответ на задание
+        UniqueConstraint("task_id", "student_id", name="unique_student_task"),
+        Index("ix_answer_task_status_addat", "task_id", "status", "add_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
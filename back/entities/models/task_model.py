@@ -1,15 +1,19 @@
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Text, ARRAY, JSON,
-    ForeignKey, Enum as SQLEnum
+    Column, Integer, String, DateTime, Text,
+    ForeignKey, Enum as SQLEnum, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from ...utils import Base
-from ..enums import LessonType
+from ..enums import LessonType, UploadStatus
 
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_task_specialty_course_deadline", "specialty", "course", "deadline"),
+        Index("ix_task_lesson_type_deadline", "lesson_type", "deadline"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -18,6 +22,12 @@ class Task(Base):
     
     files_metadata = Column(JSONB, nullable=True, default=[]) 
     photos_metadata = Column(JSONB, nullable=True, default=[])
+    upload_status = Column(
+        SQLEnum(UploadStatus, name='upload_status'),
+        nullable=False,
+        default=UploadStatus.READY,
+        server_default=UploadStatus.READY.name
+    )
     
     
     lesson_name = Column(String(255), nullable=False)
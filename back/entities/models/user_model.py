@@ -14,8 +14,8 @@ class User(Base):
     __tablename__ = "users"
     
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), unique=True, nullable=False, index=True)
-    username = Column(String(100), unique=True, index=True)
+    email = Column(String(255), unique=True, nullable=False)
+    username = Column(String(100), unique=True)
     
     hashed_password = Column(String(255))
     
@@ -32,7 +32,7 @@ class User(Base):
         default=OAuthProvider.LOCAL,
         index=True
     )
-    oauth_id = Column(String(255), index=True)
+    oauth_id = Column(String(255))
     oauth_access_token = Column(Text)
     oauth_refresh_token = Column(Text)
     oauth_token_expires_at = Column(DateTime)
@@ -50,9 +50,15 @@ class User(Base):
     )
     last_login_at = Column(DateTime)
     
+    # Уникальные ограничения на email, username и (oauth_provider, oauth_id)
+    # создают B-tree индексы, которыми пользуются get_by_email,
+    # get_by_username и get_by_oauth; отдельные индексы не нужны.
     __table_args__ = (
         UniqueConstraint('oauth_provider', 'oauth_id', name='unique_oauth_provider_id'),
     )
+    # updated_at, выставленный БД при UPDATE, возвращается через RETURNING
+    # того же запроса, а не дочитывается отдельным SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
\ No newline at end of file
@@ -1,6 +1,6 @@
 from .user_schemas import UserBase, UserCreate, UserInDB, User
 from .token_schemas import Token, TokenData
-from .task_schemas import TaskBase, TaskCreate, TaskUpdate, Task
+from .task_schemas import TaskBase, TaskCreate, TaskUpdate, Task, UploadRequest, UploadedObject, UploadTarget, TaskUploadStatus
 from .answer_schemas import AnswerBase, AnswerCreate, AnswerUpdate, AnswerGrade, Answer
 
 __all__ = [
@@ -14,6 +14,10 @@ __all__ = [
     "TaskCreate",
     "TaskUpdate",
     "Task",
+    "UploadRequest",
+    "UploadedObject",
+    "UploadTarget",
+    "TaskUploadStatus",
     "AnswerBase",
     "AnswerCreate",
     "AnswerUpdate",
@@ -1,12 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from ..enums import AnswerStatus
-
-
-class FileMetadata(BaseModel):
-    name: str
-    url: str
+from .task_schemas import FileMetadata
 
 
 class AnswerBase(BaseModel):
@@ -45,5 +41,4 @@ class Answer(AnswerBase):
     add_at: datetime
     graded_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
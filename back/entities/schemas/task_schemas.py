@@ -1,11 +1,13 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Literal, TypedDict
 from datetime import datetime
-from ..enums import LessonType
+from ..enums import LessonType, UploadStatus
 
 
 
-class FileMetadata(BaseModel):
+# TypedDict: элементы списков валидируются в обычные словари
+# без создания экземпляра модели на каждый файл.
+class FileMetadata(TypedDict):
     name: str
     url: str
 
@@ -47,6 +49,30 @@ class TaskUpdate(BaseModel):
 class Task(TaskBase):
     """Схема для ответа - включает ID и все поля из TaskBase"""
     id: int
+    upload_status: UploadStatus = UploadStatus.READY
     
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UploadRequest(BaseModel):
+    """Имена файлов, которые клиент загрузит напрямую в MinIO"""
+    files: List[str] = Field(default_factory=list)
+    photos: List[str] = Field(default_factory=list)
+
+
+class UploadedObject(BaseModel):
+    """Объект, загруженный клиентом по presigned URL"""
+    name: str
+    object_name: str
+    kind: Literal["files", "photos"]
+
+
+class UploadTarget(UploadedObject):
+    """Presigned PUT URL для прямой загрузки в MinIO"""
+    url: str
+
+
+class TaskUploadStatus(BaseModel):
+    """Состояние фоновой загрузки файлов задачи"""
+    task_id: int
+    upload_status: UploadStatus
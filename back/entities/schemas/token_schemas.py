@@ -1,8 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
-from datetime import datetime
-from enum import Enum
-from .user_schemas import UserRole
+from pydantic import BaseModel
+from ..enums import UserRole
 
 
 class Token(BaseModel):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 from datetime import datetime
 from ..enums import UserRole, OAuthProvider
@@ -24,8 +24,7 @@ class User(UserBase):
     created_at: datetime
     last_login_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserInDB(User):
@@ -35,5 +34,4 @@ class UserInDB(User):
     oauth_refresh_token: Optional[str] = None
     oauth_token_expires_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,16 +1,19 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .routers import ai_tools_router, o2auth_router, user_router, task_router, answer_router
-from .utils import sessionmanager, minio_manager
+from .utils import sessionmanager, minio_manager, settings, UploadLimitMiddleware
+from .ai_utils import converter
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     sessionmanager.init_db()
     await minio_manager.init_minio()
+    converter.init()
     yield
     await sessionmanager.close()
     await minio_manager.close()
+    await converter.close()
 
 
 app = FastAPI(
@@ -18,6 +21,9 @@ app = FastAPI(
     swagger_ui_parameters={"operationsSorter": 'method'}
     )
 
+# Слишком большие multipart-запросы отклоняются до разбора формы
+app.add_middleware(UploadLimitMiddleware, max_bytes=settings.MAX_UPLOAD_SIZE)
+
 app.include_router(ai_tools_router)
 app.include_router(o2auth_router)
 app.include_router(user_router)
@@ -1,17 +1,18 @@
 from sqlalchemy.future import select
+from sqlalchemy import func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from typing import Sequence, Optional
-from datetime import datetime
 
 from ..repo import BaseRepository
-from ..entities.models import Answer
+from ..entities.models import Answer, Task
 from ..utils import get_db
 from ..entities.enums import AnswerStatus
 
 
 class AnswerRepository(BaseRepository[Answer]):
     """Репозиторий для работы с ответами на задания"""
+    __slots__ = ()
     
     def __init__(self, session: AsyncSession):
         super().__init__(Answer, session)
@@ -25,19 +26,95 @@ class AnswerRepository(BaseRepository[Answer]):
         result = await self.session.execute(statement)
         return result.scalar_one_or_none()
 
-    async def get_all_by_task(self, task_id: int) -> Sequence[Answer]:
-        """Получить все ответы на конкретное задание"""
-        statement = select(self.model).where(
-            self.model.task_id == task_id
-        ).order_by(self.model.add_at.desc())
+    async def get_for_user(
+        self,
+        answer_id: int,
+        user_id: int,
+        is_admin: bool
+    ) -> tuple[Answer | None, bool]:
+        """Получить ответ и признак права пользователя на его просмотр.
+
+        Право (автор ответа, проверяющий задания или admin) вычисляется
+        в том же запросе.
+        """
+        if is_admin:
+            # Admin видит любой ответ: задание для проверки прав не нужно
+            answer = await self.get(answer_id)
+            return answer, answer is not None
+
+        can_view = or_(
+            self.model.student_id == user_id,
+            Task.checker == user_id
+        ).label("can_view")
+        statement = select(self.model, can_view).join(
+            Task, self.model.task_id == Task.id
+        ).where(self.model.id == answer_id)
+        result = await self.session.execute(statement)
+        row = result.first()
+        return (row[0], row[1]) if row else (None, False)
+
+    async def get_task_and_existing_answer_id(
+        self,
+        task_id: int,
+        student_id: int
+    ) -> tuple[Task, int | None] | None:
+        """Получить задание и id уже отправленного студентом ответа (если есть)"""
+        statement = select(Task, self.model.id).outerjoin(
+            self.model,
+            and_(self.model.task_id == Task.id, self.model.student_id == student_id)
+        ).where(Task.id == task_id)
+        result = await self.session.execute(statement)
+        row = result.first()
+        return (row[0], row[1]) if row else None
+
+    async def grade_if_authorized(
+        self,
+        answer_id: int,
+        user_id: int,
+        is_admin: bool,
+        data: dict
+    ) -> Answer | None:
+        """Выставить оценку, если пользователь - проверяющий задания или admin.
+
+        Права проверяются в том же UPDATE (UPDATE ... FROM tasks).
+        """
+        conditions = [] if is_admin else [
+            self.model.task_id == Task.id,
+            Task.checker == user_id
+        ]
+        return await self.update_where(answer_id, data, *conditions)
+
+    async def get_all_by_task(
+        self,
+        task_id: int,
+        limit: int = 50,
+        offset: int = 0,
+        checker_id: Optional[int] = None
+    ) -> Sequence[Answer]:
+        """Получить ответы на конкретное задание (постранично).
+
+        С checker_id - только если задание проверяет этот пользователь.
+        """
+        statement = self._for_checker(
+            select(self.model).where(self.model.task_id == task_id), checker_id
+        ).order_by(
+            self.model.add_at.desc(), self.model.id.desc()
+        ).limit(limit).offset(offset)
         result = await self.session.execute(statement)
         return result.scalars().all()
 
-    async def get_all_by_student(self, student_id: int) -> Sequence[Answer]:
-        """Получить все ответы конкретного студента"""
+    async def get_all_by_student(
+        self,
+        student_id: int,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Sequence[Answer]:
+        """Получить ответы конкретного студента (постранично)"""
         statement = select(self.model).where(
             self.model.student_id == student_id
-        ).order_by(self.model.add_at.desc())
+        ).order_by(
+            self.model.add_at.desc(), self.model.id.desc()
+        ).limit(limit).offset(offset)
         result = await self.session.execute(statement)
         return result.scalars().all()
 
@@ -69,9 +146,11 @@ class AnswerRepository(BaseRepository[Answer]):
 
     async def count_by_task(self, task_id: int) -> int:
         """Подсчитать количество ответов на задание"""
-        statement = select(self.model).where(self.model.task_id == task_id)
+        statement = select(func.count()).select_from(self.model).where(
+            self.model.task_id == task_id
+        )
         result = await self.session.execute(statement)
-        return len(result.scalars().all())
+        return result.scalar_one()
 
     async def get_answers_with_filters(
         self,
@@ -79,26 +158,43 @@ class AnswerRepository(BaseRepository[Answer]):
         student_id: Optional[int] = None,
         status: Optional[AnswerStatus] = None,
         grade_min: Optional[int] = None,
-        grade_max: Optional[int] = None
+        grade_max: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0,
+        checker_id: Optional[int] = None
     ) -> Sequence[Answer]:
-        """Получить ответы с множественными фильтрами"""
-        statement = select(self.model)
-        
+        """Получить ответы с множественными фильтрами (постранично).
+
+        С checker_id - только ответы на задания этого проверяющего.
+        """
+        conditions = []
         if task_id:
-            statement = statement.where(self.model.task_id == task_id)
+            conditions.append(self.model.task_id == task_id)
         if student_id:
-            statement = statement.where(self.model.student_id == student_id)
+            conditions.append(self.model.student_id == student_id)
         if status:
-            statement = statement.where(self.model.status == status)
+            conditions.append(self.model.status == status)
         if grade_min is not None:
-            statement = statement.where(self.model.grade >= grade_min)
+            conditions.append(self.model.grade >= grade_min)
         if grade_max is not None:
-            statement = statement.where(self.model.grade <= grade_max)
+            conditions.append(self.model.grade <= grade_max)
         
-        statement = statement.order_by(self.model.add_at.desc())
+        statement = self._for_checker(
+            select(self.model).where(*conditions), checker_id
+        ).order_by(
+            self.model.add_at.desc(), self.model.id.desc()
+        ).limit(limit).offset(offset)
         result = await self.session.execute(statement)
         return result.scalars().all()
 
+    def _for_checker(self, statement, checker_id: Optional[int]):
+        """Ограничить выборку заданиями проверяющего (JOIN tasks в том же запросе)"""
+        if checker_id is None:
+            return statement
+        return statement.join(Task, self.model.task_id == Task.id).where(
+            Task.checker == checker_id
+        )
+
 
 def get_answer_repo(session: AsyncSession = Depends(get_db)) -> AnswerRepository:
     """Dependency для получения репозитория ответов"""
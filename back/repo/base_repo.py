@@ -1,6 +1,8 @@
 from typing import Type, TypeVar, Generic, List, Dict, Any, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, func, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import SQLModel
 from fastapi import HTTPException
 import uuid
@@ -8,18 +10,30 @@ import uuid
 T = TypeVar("T", bound=SQLModel)
 
 class BaseRepository(Generic[T]):
+    # Репозитории (и сервисы поверх них) создаются на каждый запрос, так как
+    # держат сессию запроса: без __dict__ это несколько записей в слоты.
+    __slots__ = ("model", "session")
+
     def __init__(self, model: Type[T], session: AsyncSession):
         self.model = model
         self.session = session
 
+    def _integrity_error(self, e: IntegrityError) -> HTTPException:
+        """HTTP-ошибка для нарушения ограничения целостности БД."""
+        return HTTPException(status_code=400, detail=str(e))
+
     async def create(self, data: Dict[str, Any], commit: bool = True) -> T:
         try:
             obj = self.model(**data)
             self.session.add(obj)
             if commit:
+                # id и серверные значения по умолчанию приходят в INSERT ... RETURNING,
+                # а expire_on_commit=False сохраняет их: повторный SELECT не нужен
                 await self.session.commit()
-                await self.session.refresh(obj)
             return obj
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise self._integrity_error(e)
         except Exception as e:
             await self.session.rollback()
             raise HTTPException(status_code=400, detail=str(e))
@@ -43,17 +57,77 @@ class BaseRepository(Generic[T]):
             setattr(obj, key, value)
 
         if commit:
-            await self.session.commit()
-            await self.session.refresh(obj)
+            try:
+                await self.session.commit()
+            except IntegrityError as e:
+                await self.session.rollback()
+                raise self._integrity_error(e)
 
         return obj
 
+    async def update_where(
+        self,
+        id: uuid.UUID,
+        data: Dict[str, Any],
+        *conditions: Any,
+        commit: bool = True
+    ) -> T | None:
+        """UPDATE ... WHERE id = :id AND <conditions> RETURNING *.
+
+        Проверка условий и запись выполняются одним атомарным запросом.
+        Возвращает None, если строка не найдена или условия не выполнены.
+        """
+        statement = (
+            update(self.model)
+            .where(self.model.id == id, *conditions)
+            .values(**data)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        try:
+            result = await self.session.execute(statement)
+            obj = result.scalar_one_or_none()
+            if commit:
+                await self.session.commit()
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise self._integrity_error(e)
+        return obj
+
+    def jsonb_append(self, column: str, entries: List[Dict[str, Any]]) -> Any:
+        """Выражение column = COALESCE(column, '[]') || :entries для update_where.
+
+        В БД передаются только новые элементы, дописывание атомарно.
+        """
+        return func.coalesce(getattr(self.model, column), literal([], JSONB)).op(
+            "||", return_type=JSONB
+        )(literal(entries, JSONB))
+
     async def delete(self, id: uuid.UUID, commit: bool = True) -> bool:
-        obj = await self.get(id)
-        if not obj:
+        if not await self.delete_where(id, commit=commit):
             raise HTTPException(status_code=404, detail="Item not found")
+        return True
 
-        await self.session.delete(obj)
+    async def delete_where(
+        self,
+        id: uuid.UUID,
+        *conditions: Any,
+        commit: bool = True
+    ) -> bool:
+        """DELETE ... WHERE id = :id AND <conditions> RETURNING id.
+
+        Один запрос вместо SELECT + DELETE; связанные строки удаляются
+        каскадами в БД (ON DELETE CASCADE). Возвращает False, если
+        строка не найдена или условия не выполнены.
+        """
+        statement = (
+            delete(self.model)
+            .where(self.model.id == id, *conditions)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        deleted = result.scalar_one_or_none() is not None
         if commit:
             await self.session.commit()
-        return True
\ No newline at end of file
+        return deleted
\ No newline at end of file
@@ -1,7 +1,10 @@
 from sqlalchemy.future import select
+from sqlalchemy import func, cast, update, delete
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
+from sqlalchemy.exc import IntegrityError
+from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends
-from typing import Sequence, Optional
+from typing import AsyncIterator, Sequence, Optional
 from datetime import datetime
 
 from ..repo import BaseRepository
@@ -10,12 +13,26 @@ from ..utils import get_db
 from ..entities.enums import LessonType
 
 
+# Сколько строк серверный курсор забирает из Postgres за раз при потоковом чтении
+STREAM_BATCH_SIZE = 100
+
+
 class TaskRepository(BaseRepository[Task]):
     """Репозиторий для работы с задачами"""
+    __slots__ = ()
     
     def __init__(self, session: AsyncSession):
         super().__init__(Task, session)
 
+    def _integrity_error(self, e: IntegrityError) -> HTTPException:
+        """Нарушение UNIQUE(title) превращается в понятную ошибку 400."""
+        if "tasks_title_key" in str(e.orig):
+            return HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Task with this title already exists"
+            )
+        return super()._integrity_error(e)
+
     async def get_by_title(self, title: str) -> Task | None:
         """Получить задачу по названию"""
         statement = select(self.model).where(self.model.title == title)
@@ -93,6 +110,18 @@ class TaskRepository(BaseRepository[Task]):
         result = await self.session.execute(statement)
         return result.scalars().all()
 
+    async def stream_search_by_lesson_name(
+        self,
+        lesson_name: str
+    ) -> AsyncIterator[Task]:
+        """Поиск задач по названию занятия через серверный курсор (построчно)"""
+        statement = select(self.model).where(
+            self.model.lesson_name.ilike(f"%{lesson_name}%")
+        ).order_by(self.model.deadline).execution_options(yield_per=STREAM_BATCH_SIZE)
+        result = await self.session.stream_scalars(statement)
+        async for task in result:
+            yield task
+
     async def get_tasks_with_filters(
         self,
         specialty: Optional[str] = None,
@@ -101,21 +130,110 @@ class TaskRepository(BaseRepository[Task]):
         checker_id: Optional[int] = None
     ) -> Sequence[Task]:
         """Получить задачи с множественными фильтрами"""
-        statement = select(self.model)
-        
+        conditions = []
         if specialty:
-            statement = statement.where(self.model.specialty == specialty)
+            conditions.append(self.model.specialty == specialty)
         if course:
-            statement = statement.where(self.model.course == course)
+            conditions.append(self.model.course == course)
         if lesson_type:
-            statement = statement.where(self.model.lesson_type == lesson_type)
+            conditions.append(self.model.lesson_type == lesson_type)
         if checker_id:
-            statement = statement.where(self.model.checker == checker_id)
+            conditions.append(self.model.checker == checker_id)
         
-        statement = statement.order_by(self.model.deadline)
+        statement = select(self.model).where(*conditions).order_by(self.model.deadline)
         result = await self.session.execute(statement)
         return result.scalars().all()
 
+    def _owner_conditions(self, user_id: int, is_admin: bool) -> list:
+        """Условия доступа к задаче: ее проверяющий или admin"""
+        return [] if is_admin else [self.model.checker == user_id]
+
+    async def update_if_owner(
+        self,
+        task_id: int,
+        user_id: int,
+        is_admin: bool,
+        data: dict
+    ) -> Task | None:
+        """Обновить задачу, если пользователь - ее проверяющий или admin.
+
+        Права проверяются в том же UPDATE. Возвращает None, если задачи
+        нет или прав недостаточно.
+        """
+        return await self.update_where(task_id, data, *self._owner_conditions(user_id, is_admin))
+
+    async def delete_if_owner(
+        self,
+        task_id: int,
+        user_id: int,
+        is_admin: bool
+    ) -> Task | None:
+        """DELETE ... WHERE id = :id AND <права> RETURNING *.
+
+        Возвращает удаленную задачу (ее метаданные нужны для очистки MinIO)
+        или None, если задачи нет или прав недостаточно.
+        """
+        statement = (
+            delete(self.model)
+            .where(self.model.id == task_id, *self._owner_conditions(user_id, is_admin))
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        task = result.scalar_one_or_none()
+        await self.session.commit()
+        return task
+
+    async def remove_metadata_entry(
+        self,
+        task_id: int,
+        column: str,
+        name: str,
+        user_id: int,
+        is_admin: bool
+    ) -> tuple[Task, dict] | None:
+        """Удалить элемент с указанным name из JSONB-списка метаданных.
+
+        Фильтрация выполняется в Postgres (jsonb_path_query_array), список
+        целиком из Python не перезаписывается. Удаленный элемент берется из
+        заблокированной копии строки до UPDATE (UPDATE ... FROM (SELECT ...
+        FOR UPDATE)), права проверяются в том же запросе.
+        Возвращает (задача, удаленный элемент) или None, если задачи,
+        элемента или прав нет.
+        """
+        metadata = getattr(self.model, column)
+        name_var = func.jsonb_build_object("name", name)
+        old = (
+            select(self.model.id, metadata.label("metadata"))
+            .where(self.model.id == task_id)
+            .with_for_update()
+            .subquery("old")
+        )
+        removed = func.jsonb_path_query_first(
+            old.c.metadata,
+            cast("$[*] ? (@.name == $name)", JSONPATH),
+            name_var,
+            type_=JSONB
+        )
+        statement = (
+            update(self.model)
+            .where(
+                self.model.id == old.c.id,
+                metadata.contains([{"name": name}]),
+                *self._owner_conditions(user_id, is_admin)
+            )
+            .values({column: func.jsonb_path_query_array(
+                metadata,
+                cast("$[*] ? (@.name != $name)", JSONPATH),
+                name_var
+            )})
+            .returning(self.model, removed)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.session.execute(statement)
+        row = result.first()
+        await self.session.commit()
+        return (row[0], row[1]) if row else None
 
 def get_task_repo(session: AsyncSession = Depends(get_db)) -> TaskRepository:
     """Dependency для получения репозитория задач"""
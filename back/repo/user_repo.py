@@ -1,49 +1,155 @@
 # repositories/user_repo.py
+import asyncio
+import secrets
 from sqlalchemy.future import select
+from sqlalchemy import bindparam, or_
+from sqlalchemy.orm import load_only
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
 from ..repo import BaseRepository
 from ..entities.models import User
-from ..utils import get_db, password_checker
+from ..utils import get_db, password_checker, sessionmanager
+
+
+# Запросы собираются один раз при импорте; значения передаются параметрами,
+# поэтому дерево выражения не строится заново на каждый вызов.
+_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+# Для логина загружаются только колонки, нужные для проверки пароля и токена
+_AUTH_BY_USERNAMES = select(User).options(
+    load_only(User.id, User.username, User.hashed_password, User.role, User.is_active)
+).where(User.username.in_(bindparam("usernames", expanding=True)))
+_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_BY_OAUTH = select(User).where(
+    User.oauth_provider == bindparam("provider"),
+    User.oauth_id == bindparam("oauth_id")
+)
+
+# Окно, в течение которого поиски пользователей при логине
+# собираются в один запрос.
+USERNAME_BATCH_WINDOW = 0.002
+
+
+class UsernameLoader:
+    """Пакетная загрузка пользователей по username.
+
+    Поиски из параллельных логинов, пришедшие в течение
+    USERNAME_BATCH_WINDOW, выполняются одним запросом
+    WHERE username IN (...) в отдельной сессии.
+    """
+
+    def __init__(self):
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._scheduled = False
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def load(self, username: str) -> User | None:
+        """Получить пользователя по username в составе ближайшей пачки."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(username, []).append(future)
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_later(USERNAME_BATCH_WINDOW, self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        task = asyncio.create_task(self._flush(pending))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _flush(self, pending: dict[str, list[asyncio.Future]]) -> None:
+        try:
+            async for session in sessionmanager.get_session():
+                result = await session.execute(_AUTH_BY_USERNAMES, {"usernames": list(pending)})
+                users = {user.username: user for user in result.scalars()}
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for username, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(users.get(username))
+
+
+username_loader = UsernameLoader()
+
+# Хэш случайного пароля: проверяется, когда пользователь не найден,
+# чтобы время ответа не выдавало существование username.
+_DUMMY_HASH = password_checker.get_password_hash(secrets.token_urlsafe(32))
 
 
 class UserRepository(BaseRepository[User]):
     """Репозиторий для работы с пользователями"""
+    __slots__ = ()
+
     def __init__(self, session: AsyncSession):
         super().__init__(User, session)
 
     async def get_by_username(self, username: str) -> User | None:
         """Получить пользователя по username"""
-        statement = select(self.model).where(self.model.username == username)
-        result = await self.session.execute(statement)
+        result = await self.session.execute(_BY_USERNAME, {"username": username})
         return result.scalar_one_or_none()
 
     async def get_by_email(self, email: str) -> User | None:
         """Получить пользователя по email"""
-        statement = select(self.model).where(self.model.email == email)
-        result = await self.session.execute(statement)
+        result = await self.session.execute(_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
     
+    async def find_conflicts(
+        self,
+        username: str | None,
+        email: str | None,
+        exclude_id: int | None = None
+    ) -> tuple[bool, bool]:
+        """Заняты ли username и email другими пользователями (один SELECT)"""
+        conditions = []
+        if username:
+            conditions.append(User.username == username)
+        if email:
+            conditions.append(User.email == email)
+        if not conditions:
+            return False, False
+
+        statement = select(User.username, User.email).where(or_(*conditions)).limit(2)
+        if exclude_id is not None:
+            statement = statement.where(User.id != exclude_id)
+        rows = (await self.session.execute(statement)).all()
+        return (
+            bool(username) and any(row.username == username for row in rows),
+            bool(email) and any(row.email == email for row in rows)
+        )
+
     async def get_by_oauth(self, provider: str, oauth_id: str) -> User | None:
         """Получить пользователя по OAuth провайдеру и ID"""
-        statement = select(self.model).where(
-            self.model.oauth_provider == provider,
-            self.model.oauth_id == oauth_id
+        result = await self.session.execute(
+            _BY_OAUTH, {"provider": provider, "oauth_id": oauth_id}
         )
-        result = await self.session.execute(statement)
         return result.scalar_one_or_none()
     
     async def authenticate_user(self, username: str, password: str) -> User | None:
-        """Аутентификация пользователя по username и паролю"""
-        user = await self.get_by_username(username)
-        if not user:
-            return None
-        if not user.hashed_password:
-            # Пользователь зарегистрирован через OAuth
+        """Аутентификация пользователя по username и паролю.
+
+        Возвращенный пользователь загружен частично (id, username,
+        hashed_password, role, is_active) и не привязан к сессии.
+        """
+        user = await username_loader.load(username)
+        if not user or not user.hashed_password:
+            # Пользователь не найден или зарегистрирован через OAuth
+            await password_checker.verify_password_async(password, _DUMMY_HASH)
             return None
-        if not password_checker.verify_password(password, user.hashed_password):
+        valid, new_hash = await password_checker.verify_and_update_async(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash is not None:
+            # Параметры argon2 в настройках изменились: перехэшируем при входе
+            await self.update_where(user.id, {"hashed_password": new_hash})
         return user
 
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, File, UploadFile, Depends
+from fastapi import APIRouter, File, UploadFile, Depends, Header
 from typing import Annotated
 from ..ai_utils import converter, testmaker
 from ..entities.enums import UserRole
@@ -25,9 +25,12 @@ async def get_ai_tools():
         summary="Конвертация лекции в md через LLM.",
         dependencies=[Depends(require_roles(UserRole.TEACHER, UserRole.ADMIN))]
         )
-async def how_llm_see_my_lecture(file: UploadFile = File(...)):
+async def how_llm_see_my_lecture(
+        file: UploadFile = File(...),
+        if_none_match: Annotated[str | None, Header()] = None
+    ):
     """Принимает файл лекции в формате pdf или docx. LLM возвращает переписанный файл в формате md."""
-    md_file = await converter.convert_as_md_file(file)
+    md_file = await converter.convert_as_md_file(file, if_none_match=if_none_match)
     return md_file
 
 
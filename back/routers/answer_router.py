@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File
+from fastapi import APIRouter, Depends, Response, status, UploadFile, File, Query
 from typing import Annotated, List, Optional
 
 from ..entities.schemas import Answer, AnswerGrade, User
@@ -9,6 +9,8 @@ from ..entities.enums import UserRole, AnswerStatus
 
 answer_router = APIRouter(prefix="/answers", tags=["answers"])
 
+PAGE_LIMIT_MAX = 200
+
 
 # GET
 @answer_router.get(
@@ -37,12 +39,14 @@ async def get_answer(
 async def get_answers_by_task(
     task_id: int,
     current_user: Annotated[User, Depends(get_current_active_user)],
+    limit: Annotated[int, Query(ge=1, le=PAGE_LIMIT_MAX)] = 50,
+    offset: Annotated[int, Query(ge=0)] = 0,
     answer_service: AnswerService = Depends(get_answer_service)
 ):
     """
-    Получить все ответы на задание. Только преподаватель-создатель или admin.
+    Получить ответы на задание постранично. Только преподаватель-создатель или admin.
     """
-    return await answer_service.get_answers_by_task(task_id, current_user)
+    return await answer_service.get_answers_by_task(task_id, current_user, limit, offset)
 
 
 @answer_router.get(
@@ -53,12 +57,14 @@ async def get_answers_by_task(
 )
 async def get_my_answers(
     current_user: Annotated[User, Depends(get_current_active_user)],
+    limit: Annotated[int, Query(ge=1, le=PAGE_LIMIT_MAX)] = 50,
+    offset: Annotated[int, Query(ge=0)] = 0,
     answer_service: AnswerService = Depends(get_answer_service)
 ):
     """
-    Получить все свои ответы.
+    Получить свои ответы постранично.
     """
-    return await answer_service.get_my_answers(current_user.id)
+    return await answer_service.get_my_answers(current_user.id, limit, offset)
 
 
 @answer_router.get(
@@ -69,12 +75,14 @@ async def get_my_answers(
 )
 async def get_answers_by_student(
     student_id: int,
+    limit: Annotated[int, Query(ge=1, le=PAGE_LIMIT_MAX)] = 50,
+    offset: Annotated[int, Query(ge=0)] = 0,
     answer_service: AnswerService = Depends(get_answer_service)
 ):
     """
-    Получить все ответы конкретного студента. Только для преподавателей и админов.
+    Получить ответы конкретного студента постранично. Только для преподавателей и админов.
     """
-    return await answer_service.get_answers_by_student(student_id)
+    return await answer_service.get_answers_by_student(student_id, limit, offset)
 
 
 @answer_router.get(
@@ -84,22 +92,29 @@ async def get_answers_by_student(
     dependencies=[Depends(require_roles(UserRole.TEACHER, UserRole.ADMIN))]
 )
 async def get_answers_with_filters(
+    current_user: Annotated[User, Depends(get_current_active_user)],
     task_id: Optional[int] = None,
     student_id: Optional[int] = None,
     status: Optional[AnswerStatus] = None,
     grade_min: Optional[int] = None,
     grade_max: Optional[int] = None,
+    limit: Annotated[int, Query(ge=1, le=PAGE_LIMIT_MAX)] = 50,
+    offset: Annotated[int, Query(ge=0)] = 0,
     answer_service: AnswerService = Depends(get_answer_service)
 ):
     """
-    Получить ответы с множественными фильтрами.
+    Получить ответы с множественными фильтрами постранично.
+    Преподаватель видит только ответы на свои задания.
     """
     return await answer_service.get_answers_with_filters(
+        current_user,
         task_id=task_id,
         student_id=student_id,
         status=status,
         grade_min=grade_min,
-        grade_max=grade_max
+        grade_max=grade_max,
+        limit=limit,
+        offset=offset
     )
 
 
@@ -180,6 +195,7 @@ async def update_answer(
 @answer_router.delete(
     "/{answer_id}",
     status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
     summary="Удаление ответа",
     dependencies=[Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN))]
 )
@@ -192,4 +208,4 @@ async def delete_answer(
     Удалить свой ответ. Можно только до проверки (статус SUBMITTED).
     """
     await answer_service.delete_answer(answer_id, current_user)
-    return None
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,15 +1,12 @@
 from typing import Annotated
-from datetime import datetime, timedelta, timezone
-from typing import Annotated
-
 
 from fastapi import Depends, APIRouter, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordRequestForm
 
-from ..entities.schemas import Token, TokenData
+from ..entities.schemas import Token
 from ..entities.models import User
 from ..repo import get_user_repo
-from ..utils import create_access_token, settings
+from ..utils import create_access_token
 
 
 o2auth_router = APIRouter(prefix="/auth", tags=["o2auth"])
@@ -27,8 +24,7 @@ async def login_for_access_token(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username, "user_role": user.role}, expires_delta=access_token_expires
+        data={"sub": user.username, "user_role": user.role}
     )
     return Token(access_token=access_token, token_type="bearer")
\ No newline at end of file
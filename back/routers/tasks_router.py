@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File
-from typing import Annotated, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import Annotated, AsyncIterator, List, Optional
 from datetime import datetime
 
-from ..entities.schemas import Task, User
+from ..entities.schemas import Task, User, UploadRequest, UploadedObject, UploadTarget, TaskUploadStatus
 from ..services import get_task_service, TaskService
 from ..utils import get_current_active_user, require_roles
-from ..entities.enums import UserRole, LessonType
+from ..entities.enums import UserRole, LessonType, UploadStatus
 
 
 task_router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+async def _ndjson(tasks: AsyncIterator) -> AsyncIterator[bytes]:
+    """Одна задача - одна строка JSON"""
+    async for task in tasks:
+        yield Task.model_validate(task).model_dump_json().encode() + b"\n"
+
+
 # POST
 @task_router.post(
     "/",
@@ -30,12 +37,17 @@ async def create_task(
     files: Annotated[List[UploadFile], File(description="На фронте или в Swagger не использовать 'Send empty value'. FastAPI сам поставит []. Если оставить 'Send empty value' то при запросе выдаст 422 ошибку.")] = [],
     photos: Annotated[List[UploadFile], File(description="На фронте или в Swagger не использовать 'Send empty value'. FastAPI сам поставит []. Если оставить 'Send empty value' то при запросе выдаст 422 ошибку.")] = [],
     current_user: Annotated[User, Depends(get_current_active_user)] = None,
+    background: BackgroundTasks = None,
+    response: Response = None,
     task_service: TaskService = Depends(get_task_service)
 ):
     """
     Создать новую задачу с возможностью загрузки файлов и фото.
+    Если переданы файлы, задача возвращается сразу с кодом 202 и
+    upload_status=PENDING; файлы загружаются в фоне, состояние доступно
+    через GET /tasks/{task_id}/upload-status.
     """
-    return await task_service.create_task(
+    task = await task_service.create_task(
         title=title,
         description=description,
         lesson_name=lesson_name,
@@ -45,8 +57,12 @@ async def create_task(
         current_user=current_user,
         deadline=deadline,
         files=files,
-        photos=photos
+        photos=photos,
+        background=background
     )
+    if task.upload_status == UploadStatus.PENDING:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return task
 
 
 # GET
@@ -62,7 +78,42 @@ async def get_task(
     """
     Получить задачу по её ID.
     """
-    return await task_service.get_task_by_id(task_id)
+    body = await task_service.get_task_json_cached(task_id)
+    return Response(content=body, media_type="application/json")
+
+
+@task_router.get(
+    "/search/stream",
+    response_class=StreamingResponse,
+    summary="Потоковый поиск задач по названию занятия (NDJSON)"
+)
+async def search_tasks_stream(
+    lesson_name: str,
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    Найти задачи по части названия занятия. Ответ в формате NDJSON:
+    строки отдаются по мере чтения из БД, список целиком в памяти не собирается.
+    """
+    return StreamingResponse(
+        _ndjson(task_service.search_tasks_stream(lesson_name)),
+        media_type="application/x-ndjson"
+    )
+
+
+@task_router.get(
+    "/{task_id}/upload-status",
+    response_model=TaskUploadStatus,
+    summary="Состояние фоновой загрузки файлов задачи"
+)
+async def get_upload_status(
+    task_id: int,
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    Узнать, загружены ли файлы задачи (PENDING, READY или FAILED).
+    """
+    return await task_service.get_upload_status(task_id)
 
 
 # PUT
@@ -105,10 +156,49 @@ async def update_task(
     )
 
 
+@task_router.post(
+    "/{task_id}/uploads",
+    response_model=List[UploadTarget],
+    summary="Presigned URL для прямой загрузки файлов в MinIO",
+    dependencies=[Depends(require_roles(UserRole.TEACHER, UserRole.ADMIN))]
+)
+async def create_upload_targets(
+    task_id: int,
+    request: UploadRequest,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    Получить presigned PUT URL (действуют 15 минут) для загрузки файлов и фото
+    напрямую в MinIO, минуя сервер. После загрузки вызвать /uploads/complete.
+    """
+    return await task_service.create_upload_targets(task_id, request, current_user)
+
+
+@task_router.post(
+    "/{task_id}/uploads/complete",
+    response_model=Task,
+    summary="Подтверждение прямой загрузки файлов",
+    dependencies=[Depends(require_roles(UserRole.TEACHER, UserRole.ADMIN))]
+)
+async def complete_upload(
+    task_id: int,
+    uploads: List[UploadedObject],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    Записать в задачу файлы, загруженные по presigned URL.
+    Сервер проверяет, что каждый объект существует в MinIO.
+    """
+    return await task_service.complete_upload(task_id, uploads, current_user)
+
+
 # DELETE
 @task_router.delete(
     "/{task_id}",
     status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
     summary="Удаление задачи",
     dependencies=[Depends(require_roles(UserRole.TEACHER, UserRole.ADMIN))]
 )
@@ -122,7 +212,7 @@ async def delete_task(
     Только создатель задачи или admin может её удалить.
     """
     await task_service.delete_task(task_id, current_user)
-    return None
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @task_router.delete(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from typing import Annotated, List, Optional
 
 from ..entities.schemas import User, UserCreate, UserBase
@@ -180,6 +180,7 @@ async def reset_user_password(
 @user_router.delete(
     "/{user_id}",
     status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
     summary="Удаление пользователя",
     dependencies=[Depends(require_roles(UserRole.ADMIN))]
 )
@@ -192,4 +193,4 @@ async def delete_user(
     Внимание: это удалит пользователя и все связанные с ним данные.
     """
     await user_service.delete_user(user_id)
-    return None
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
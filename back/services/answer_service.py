@@ -1,17 +1,17 @@
 from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import func
 from fastapi import Depends, HTTPException, status, UploadFile
-import uuid
 
 from ..repo import get_answer_repo, get_task_repo, AnswerRepository, TaskRepository
 from ..entities.models import Answer, User
 from ..entities.schemas import AnswerGrade
 from ..entities.enums import UserRole, AnswerStatus
-from ..utils import get_minio, MinioManager
+from ..utils import get_minio, MinioManager, uuid7_hex
 
 
 class AnswerService:
     """Сервис для работы с ответами на задания"""
+    __slots__ = ("answer_repo", "task_repo", "minio")
     
     def __init__(
         self,
@@ -33,20 +33,19 @@ class AnswerService:
         Студент видит только свои ответы.
         Преподаватель/admin видит ответы на свои задания.
         """
-        answer = await self.answer_repo.get(answer_id)
+        # Ответ и проверка прав доступа - один запрос
+        answer, can_view = await self.answer_repo.get_for_user(
+            answer_id,
+            current_user.id,
+            current_user.role == UserRole.ADMIN
+        )
         if not answer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Answer not found"
             )
         
-        # Проверка прав доступа
-        task = await self.task_repo.get(answer.task_id)
-        is_student_owner = answer.student_id == current_user.id
-        is_task_checker = task.checker == current_user.id
-        is_admin = current_user.role == UserRole.ADMIN
-        
-        if not (is_student_owner or is_task_checker or is_admin):
+        if not can_view:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to view this answer"
@@ -57,51 +56,75 @@ class AnswerService:
     async def get_answers_by_task(
         self,
         task_id: int,
-        current_user: User
+        current_user: User,
+        limit: int = 50,
+        offset: int = 0
     ) -> List[Answer]:
         """
-        Получить все ответы на задание.
+        Получить ответы на задание.
         Только преподаватель-создатель или admin.
         """
+        # Права проверяются в том же запросе, что и выборка ответов
+        checker_id = None if current_user.role == UserRole.ADMIN else current_user.id
+        answers = await self.answer_repo.get_all_by_task(task_id, limit, offset, checker_id)
+        if answers:
+            return answers
+        
+        # Пустая страница: задания нет, нет прав или ответов действительно нет
         task = await self.task_repo.get(task_id)
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
-        
-        # Проверка прав
-        if task.checker != current_user.id and current_user.role != UserRole.ADMIN:
+        if checker_id is not None and task.checker != checker_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to view answers for this task"
             )
-        
-        return await self.answer_repo.get_all_by_task(task_id)
+        return answers
     
-    async def get_my_answers(self, student_id: int) -> List[Answer]:
-        """Получить все свои ответы"""
-        return await self.answer_repo.get_all_by_student(student_id)
+    async def get_my_answers(
+        self,
+        student_id: int,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Answer]:
+        """Получить свои ответы"""
+        return await self.answer_repo.get_all_by_student(student_id, limit, offset)
     
-    async def get_answers_by_student(self, student_id: int) -> List[Answer]:
-        """Получить все ответы студента (для преподавателя/admin)"""
-        return await self.answer_repo.get_all_by_student(student_id)
+    async def get_answers_by_student(
+        self,
+        student_id: int,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Answer]:
+        """Получить ответы студента (для преподавателя/admin)"""
+        return await self.answer_repo.get_all_by_student(student_id, limit, offset)
     
     async def get_answers_with_filters(
         self,
+        current_user: User,
         task_id: Optional[int] = None,
         student_id: Optional[int] = None,
         status: Optional[AnswerStatus] = None,
         grade_min: Optional[int] = None,
-        grade_max: Optional[int] = None
+        grade_max: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0
     ) -> List[Answer]:
-        """Получить ответы с множественными фильтрами"""
+        """Получить ответы с множественными фильтрами.
+        Преподаватель видит только ответы на свои задания, admin - все.
+        """
         return await self.answer_repo.get_answers_with_filters(
             task_id=task_id,
             student_id=student_id,
             status=status,
             grade_min=grade_min,
-            grade_max=grade_max
+            grade_max=grade_max,
+            limit=limit,
+            offset=offset,
+            checker_id=None if current_user.role == UserRole.ADMIN else current_user.id
         )
     
     async def create_answer(
@@ -116,53 +139,47 @@ class AnswerService:
         Создать ответ на задание.
         Студент может отправить только один ответ на задание.
         """
-        # Проверяем существование задания
-        task = await self.task_repo.get(task_id)
-        if not task:
+        # Проверяем существование задания и то, не отправлял ли студент уже ответ
+        found = await self.answer_repo.get_task_and_existing_answer_id(
+            task_id, current_user.id
+        )
+        if not found:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
         
-        # Проверяем, не отправлял ли студент уже ответ
-        existing_answer = await self.answer_repo.get_by_task_and_student(
-            task_id, current_user.id
-        )
-        if existing_answer:
+        _, existing_answer_id = found
+        if existing_answer_id is not None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="You have already submitted an answer for this task"
             )
         
-        # Создаем ответ
+        # Загружаем файлы и фото до создания ответа, чтобы записать его одним INSERT.
+        # id ответа еще неизвестен, поэтому каталог в MinIO именуется по UUID.
+        self.minio.validate_images(photos)
+        answer_key = uuid7_hex()
+        files_metadata, photos_metadata = await self.minio.gather_attachments(
+            self._upload_files(answer_key, files),
+            self._upload_photos(answer_key, photos)
+        )
+        
         answer_data = {
             "task_id": task_id,
             "student_id": current_user.id,
             "message": message,
             "status": AnswerStatus.SUBMITTED,
-            "files_metadata": [],
-            "photos_metadata": []
+            "files_metadata": files_metadata,
+            "photos_metadata": photos_metadata
         }
         
-        answer = await self.answer_repo.create(answer_data)
-        
-        # Загружаем файлы
-        if files:
-            files_metadata = await self._upload_files(answer.id, files)
-            answer = await self.answer_repo.update(
-                answer.id,
-                {"files_metadata": files_metadata}
-            )
-        
-        # Загружаем фото
-        if photos:
-            photos_metadata = await self._upload_photos(answer.id, photos)
-            answer = await self.answer_repo.update(
-                answer.id,
-                {"photos_metadata": photos_metadata}
-            )
-        
-        return answer
+        try:
+            return await self.answer_repo.create(answer_data)
+        except Exception:
+            # Ответ не сохранился - загруженные файлы больше не нужны
+            await self.minio.delete_attachments(files_metadata + photos_metadata)
+            raise
     
     async def update_answer(
         self,
@@ -201,20 +218,37 @@ class AnswerService:
         if message is not None:
             update_data["message"] = message
         
-        # Добавляем новые файлы к существующим
-        if files:
-            existing_files = answer.files_metadata or []
-            new_files = await self._upload_files(answer.id, files)
-            update_data["files_metadata"] = existing_files + new_files
-        
-        # Добавляем новые фото к существующим
-        if photos:
-            existing_photos = answer.photos_metadata or []
-            new_photos = await self._upload_photos(answer.id, photos)
-            update_data["photos_metadata"] = existing_photos + new_photos
+        # Добавляем новые файлы и фото к существующим, загружая параллельно
+        self.minio.validate_images(photos)
+        new_files, new_photos = await self.minio.gather_attachments(
+            self._upload_files(answer.id, files),
+            self._upload_photos(answer.id, photos)
+        )
+        if new_files:
+            update_data["files_metadata"] = self.answer_repo.jsonb_append("files_metadata", new_files)
+        if new_photos:
+            update_data["photos_metadata"] = self.answer_repo.jsonb_append("photos_metadata", new_photos)
         
         if update_data:
-            answer = await self.answer_repo.update(answer_id, update_data)
+            # Статус проверяется повторно в самом UPDATE: ответ могли оценить,
+            # пока загружались файлы
+            try:
+                updated = await self.answer_repo.update_where(
+                    answer_id,
+                    update_data,
+                    Answer.status == AnswerStatus.SUBMITTED
+                )
+            except Exception:
+                await self.minio.delete_attachments(new_files + new_photos)
+                raise
+            if not updated:
+                # Новые загрузки ни на что не ссылаются - удаляем их
+                await self.minio.delete_attachments(new_files + new_photos)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cannot update answer that has been graded or returned"
+                )
+            answer = updated
         
         return answer
     
@@ -228,30 +262,34 @@ class AnswerService:
         Выставить оценку за ответ.
         Только преподаватель-создатель задания или admin.
         """
-        answer = await self.answer_repo.get(answer_id)
-        if not answer:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Answer not found"
-            )
-        
-        # Проверка прав
-        task = await self.task_repo.get(answer.task_id)
-        if task.checker != current_user.id and current_user.role != UserRole.ADMIN:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to grade this answer"
-            )
-        
-        # Обновляем ответ с оценкой
         update_data = {
             "grade": grade_data.grade,
             "teacher_comment": grade_data.teacher_comment,
             "status": grade_data.status,
-            "graded_at": datetime.now()
+            # Время проставляет сама БД: без naive-времени сервера
+            "graded_at": func.now()
         }
         
-        return await self.answer_repo.update(answer_id, update_data)
+        # Проверка прав и запись оценки - один атомарный UPDATE
+        answer = await self.answer_repo.grade_if_authorized(
+            answer_id,
+            current_user.id,
+            current_user.role == UserRole.ADMIN,
+            update_data
+        )
+        if answer:
+            return answer
+        
+        # Строка не обновлена: ответа нет или нет прав
+        if not await self.answer_repo.get(answer_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Answer not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to grade this answer"
+        )
     
     async def delete_answer(
         self,
@@ -295,77 +333,26 @@ class AnswerService:
     
     async def _upload_files(
         self,
-        answer_id: int,
+        answer_key: int | str,
         files: List[UploadFile]
     ) -> List[dict]:
         """Загрузить файлы в MinIO"""
-        files_metadata = []
-        for file in files:
-            file_id = str(uuid.uuid4())
-            extension = file.filename.split('.')[-1] if file.filename and '.' in file.filename else ''
-            object_name = f"answers/{answer_id}/files/{file_id}.{extension}" if extension else f"answers/{answer_id}/files/{file_id}"
-            
-            file_url = await self.minio.upload_file(file, object_name)
-            files_metadata.append({
-                "name": file.filename,
-                "url": file_url
-            })
-        return files_metadata
+        return await self.minio.upload_attachments(f"answers/{answer_key}/files", files)
     
     async def _upload_photos(
         self,
-        answer_id: int,
+        answer_key: int | str,
         photos: List[UploadFile]
     ) -> List[dict]:
         """Загрузить фото в MinIO с валидацией типов"""
-        allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-        photos_metadata = []
-        
-        for photo in photos:
-            if photo.content_type not in allowed_types:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File {photo.filename} is not an image"
-                )
-            
-            file_id = str(uuid.uuid4())
-            extension = photo.filename.split('.')[-1] if photo.filename and '.' in photo.filename else 'jpg'
-            object_name = f"answers/{answer_id}/photos/{file_id}.{extension}"
-            
-            photo_url = await self.minio.upload_file(photo, object_name)
-            photos_metadata.append({
-                "name": photo.filename,
-                "url": photo_url
-            })
-        
-        return photos_metadata
+        self.minio.validate_images(photos)
+        return await self.minio.upload_attachments(f"answers/{answer_key}/photos", photos, "jpg")
     
     async def _delete_answer_files(self, answer: Answer) -> None:
         """Удалить все файлы ответа из MinIO"""
-        # Удаляем файлы
-        if answer.files_metadata:
-            for file_meta in answer.files_metadata:
-                try:
-                    await self._delete_file_from_minio(file_meta)
-                except Exception as e:
-                    print(f"Failed to delete file: {e}")
-        
-        # Удаляем фото
-        if answer.photos_metadata:
-            for photo_meta in answer.photos_metadata:
-                try:
-                    await self._delete_file_from_minio(photo_meta)
-                except Exception as e:
-                    print(f"Failed to delete photo: {e}")
-    
-    async def _delete_file_from_minio(self, file_meta: dict) -> None:
-        """Удалить файл из MinIO по метаданным"""
-        url = file_meta.get("url", "")
-        if url:
-            # URL формат: http://host:port/bucket/object_name
-            # Извлекаем object_name (путь после bucket)
-            object_name = "/".join(url.split("/")[4:])
-            await self.minio.delete_file(object_name)
+        await self.minio.delete_attachments(
+            (answer.files_metadata or []) + (answer.photos_metadata or [])
+        )
 
 
 def get_answer_service(
@@ -1,16 +1,28 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, NoReturn, Optional
 from datetime import datetime
-from fastapi import Depends, HTTPException, status, UploadFile
-import uuid
+from fastapi import BackgroundTasks, Depends, HTTPException, status, UploadFile
+import asyncio
 
 from ..repo import get_task_repo, TaskRepository
 from ..entities.models import Task, User
-from ..entities.enums import UserRole
-from ..utils import get_minio, MinioManager
+from ..entities.schemas import Task as TaskSchema, UploadRequest, UploadedObject
+from ..entities.enums import UserRole, UploadStatus
+from ..utils import get_minio, MinioManager, TTLCache, sessionmanager, uuid7_hex, ALLOWED_IMAGE_TYPES
+
+
+# Кэш чтения задач по id, общий для всех запросов процесса: хранится готовый
+# JSON, поэтому попадание не валидирует и не сериализует задачу заново.
+# Короткий TTL ограничивает устаревание при нескольких воркерах; в своем
+# процессе записи сбрасывают ключ сразу.
+TASK_CACHE_SIZE = 1024
+TASK_CACHE_TTL = 5
+
+_task_cache: TTLCache[bytes] = TTLCache(TASK_CACHE_SIZE, TASK_CACHE_TTL)
 
 
 class TaskService:
     """Сервис для работы с задачами"""
+    __slots__ = ("task_repo", "minio")
     
     def __init__(self, task_repo: TaskRepository, minio: MinioManager):
         self.task_repo = task_repo
@@ -26,6 +38,19 @@ class TaskService:
             )
         return task
     
+    async def get_task_json_cached(self, task_id: int) -> bytes:
+        """Получить задачу по ID в виде JSON через кэш (только для чтения)"""
+        body = _task_cache.get(task_id)
+        if body is None:
+            task = await self.get_task_by_id(task_id)
+            body = TaskSchema.model_validate(task).model_dump_json().encode()
+            _task_cache.set(task_id, body)
+        return body
+    
+    def search_tasks_stream(self, lesson_name: str) -> AsyncIterator[Task]:
+        """Поиск задач по названию занятия без загрузки всего списка в память"""
+        return self.task_repo.stream_search_by_lesson_name(lesson_name)
+    
     async def create_task(
         self,
         title: str,
@@ -37,18 +62,17 @@ class TaskService:
         current_user: User,
         deadline: Optional[datetime] = None,
         files: List[UploadFile] = [],
-        photos: List[UploadFile] = []
+        photos: List[UploadFile] = [],
+        background: Optional[BackgroundTasks] = None
     ) -> Task:
-        """Создать новую задачу"""
-        # Проверка уникальности названия
-        existing_task = await self.task_repo.get_by_title(title)
-        if existing_task:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Task with this title already exists"
-            )
+        """Создать новую задачу.
+
+        Если переданы файлы и background, задача создается со статусом
+        PENDING, а загрузка в MinIO выполняется после ответа клиенту.
+        """
+        self.minio.validate_images(photos)
+        deferred = background is not None and bool(files or photos)
         
-        # Создаем задачу
         task_data = {
             "title": title,
             "description": description,
@@ -59,22 +83,45 @@ class TaskService:
             "course": course,
             "deadline": deadline,
             "files_metadata": [],
-            "photos_metadata": []
+            "photos_metadata": [],
+            "upload_status": UploadStatus.PENDING if deferred else UploadStatus.READY
         }
         
-        task = await self.task_repo.create(task_data)
-        
-        # Загружаем файлы
-        if files:
-            files_metadata = await self._upload_files(task.id, files, "files")
-            task = await self.task_repo.update(task.id, {"files_metadata": files_metadata})
-        
-        # Загружаем фото
-        if photos:
-            photos_metadata = await self._upload_photos(task.id, photos)
-            task = await self.task_repo.update(task.id, {"photos_metadata": photos_metadata})
-        
-        return task
+        if deferred:
+            # Файлы запроса закрываются после ответа, поэтому фоновой задаче
+            # передаются их копии
+            copies = await self.minio.detach_uploads(files + photos)
+            files, photos = copies[:len(files)], copies[len(files):]
+            try:
+                task = await self.task_repo.create(task_data)
+            except BaseException:
+                for file in copies:
+                    await file.close()
+                raise
+            background.add_task(self._process_uploads, task.id, files, photos)
+            return task
+        
+        # Синхронный путь: загружаем до создания задачи, чтобы записать ее одним INSERT.
+        # id задачи еще неизвестен, поэтому каталог в MinIO именуется по UUID.
+        task_key = uuid7_hex()
+        files_metadata, photos_metadata = await self.minio.gather_attachments(
+            self._upload_files(task_key, files, "files"),
+            self._upload_photos(task_key, photos)
+        )
+        task_data["files_metadata"] = files_metadata
+        task_data["photos_metadata"] = photos_metadata
+        
+        try:
+            return await self.task_repo.create(task_data)
+        except Exception:
+            # Задача не сохранилась - загруженные файлы больше не нужны
+            await self.minio.delete_attachments(files_metadata + photos_metadata)
+            raise
+    
+    async def get_upload_status(self, task_id: int) -> dict:
+        """Состояние фоновой загрузки файлов задачи"""
+        task = await self.get_task_by_id(task_id)
+        return {"task_id": task.id, "upload_status": task.upload_status}
     
     async def update_task(
         self,
@@ -90,23 +137,20 @@ class TaskService:
         files: List[UploadFile] = [],
         photos: List[UploadFile] = []
     ) -> Task:
-        """Обновить задачу"""
-        task = await self.get_task_by_id(task_id)
-        
-        # Проверка прав
-        if task.checker != current_user.id and current_user.role != UserRole.ADMIN:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to update this task"
-            )
-        
-        # Проверка уникальности названия
-        if title and title != task.title:
-            existing_task = await self.task_repo.get_by_title(title)
-            if existing_task:
+        """Обновить задачу.
+
+        Права проверяются в самом UPDATE; отдельный SELECT выполняется
+        только перед загрузкой файлов, чтобы не писать в MinIO без прав.
+        """
+        # Типы фото проверяются до любых обращений к БД и MinIO
+        self.minio.validate_images(photos)
+        is_admin = current_user.role == UserRole.ADMIN
+        if files or photos:
+            task = await self.get_task_by_id(task_id)
+            if task.checker != current_user.id and not is_admin:
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Task with this title already exists"
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You don't have permission to update this task"
                 )
         
         update_data = {}
@@ -125,39 +169,52 @@ class TaskService:
         if deadline is not None:
             update_data["deadline"] = deadline
         
-        # Добавляем новые файлы
-        if files:
-            existing_files = task.files_metadata or []
-            new_files = await self._upload_files(task.id, files, "files")
-            update_data["files_metadata"] = existing_files + new_files
-        
-        # Добавляем новые фото
-        if photos:
-            existing_photos = task.photos_metadata or []
-            new_photos = await self._upload_photos(task.id, photos)
-            update_data["photos_metadata"] = existing_photos + new_photos
-        
-        if update_data:
-            task = await self.task_repo.update(task_id, update_data)
-        
+        # Добавляем новые файлы и фото, загружая параллельно
+        new_files, new_photos = await self.minio.gather_attachments(
+            self._upload_files(task_id, files, "files"),
+            self._upload_photos(task_id, photos)
+        )
+        if new_files:
+            update_data["files_metadata"] = self.task_repo.jsonb_append("files_metadata", new_files)
+        if new_photos:
+            update_data["photos_metadata"] = self.task_repo.jsonb_append("photos_metadata", new_photos)
+        
+        if not update_data:
+            task = await self.get_task_by_id(task_id)
+            if task.checker != current_user.id and not is_admin:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You don't have permission to update this task"
+                )
+            return task
+        
+        try:
+            task = await self.task_repo.update_if_owner(task_id, current_user.id, is_admin, update_data)
+        except Exception:
+            # Уникальность title проверяет БД: при конфликте убираем новые загрузки
+            await self.minio.delete_attachments(new_files + new_photos)
+            raise
+        if task is None:
+            await self.minio.delete_attachments(new_files + new_photos)
+            await self._raise_not_found_or_forbidden(
+                task_id, current_user, "You don't have permission to update this task"
+            )
+        _task_cache.pop(task_id)
         return task
     
     async def delete_task(self, task_id: int, current_user: User) -> None:
-        """Удалить задачу"""
-        task = await self.get_task_by_id(task_id)
-        
-        # Проверка прав
-        if task.checker != current_user.id and current_user.role != UserRole.ADMIN:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to delete this task"
+        """Удалить задачу (проверка прав и удаление - один DELETE ... RETURNING)"""
+        task = await self.task_repo.delete_if_owner(
+            task_id, current_user.id, current_user.role == UserRole.ADMIN
+        )
+        if task is None:
+            await self._raise_not_found_or_forbidden(
+                task_id, current_user, "You don't have permission to delete this task"
             )
+        _task_cache.pop(task_id)
         
         # Удаляем файлы из MinIO
         await self._delete_task_files(task)
-        
-        # Удаляем задачу
-        await self.task_repo.delete(task_id)
     
     async def delete_task_file(
         self,
@@ -166,6 +223,24 @@ class TaskService:
         current_user: User
     ) -> Task:
         """Удалить файл из задачи"""
+        return await self._delete_attachment(task_id, "files_metadata", file_name, current_user)
+    
+    async def delete_task_photo(
+        self,
+        task_id: int,
+        photo_name: str,
+        current_user: User
+    ) -> Task:
+        """Удалить фото из задачи"""
+        return await self._delete_attachment(task_id, "photos_metadata", photo_name, current_user)
+    
+    async def create_upload_targets(
+        self,
+        task_id: int,
+        request: UploadRequest,
+        current_user: User
+    ) -> List[dict]:
+        """Выдать presigned PUT URL для загрузки файлов напрямую в MinIO"""
         task = await self.get_task_by_id(task_id)
         
         if task.checker != current_user.id and current_user.role != UserRole.ADMIN:
@@ -174,40 +249,27 @@ class TaskService:
                 detail="You don't have permission to modify this task"
             )
         
-        if not task.files_metadata:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No files found in this task"
-            )
-        
-        # Находим и удаляем файл
-        file_to_delete = None
-        updated_files = []
-        
-        for file_meta in task.files_metadata:
-            if file_meta.get("name") == file_name:
-                file_to_delete = file_meta
-            else:
-                updated_files.append(file_meta)
-        
-        if not file_to_delete:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"File '{file_name}' not found in task"
-            )
-        
-        # Удаляем из MinIO
-        await self._delete_file_from_minio(file_to_delete)
-        
-        return await self.task_repo.update(task_id, {"files_metadata": updated_files})
+        targets = [
+            {"name": name, "object_name": self.minio.new_object_name(f"tasks/{task.id}/files", name), "kind": "files"}
+            for name in request.files
+        ] + [
+            {"name": name, "object_name": self.minio.new_object_name(f"tasks/{task.id}/photos", name, "jpg"), "kind": "photos"}
+            for name in request.photos
+        ]
+        urls = await asyncio.gather(
+            *(self.minio.get_presigned_put_url(target["object_name"]) for target in targets)
+        )
+        for target, url in zip(targets, urls):
+            target["url"] = url
+        return targets
     
-    async def delete_task_photo(
+    async def complete_upload(
         self,
         task_id: int,
-        photo_name: str,
+        uploads: List[UploadedObject],
         current_user: User
     ) -> Task:
-        """Удалить фото из задачи"""
+        """Записать в задачу файлы, загруженные клиентом по presigned URL"""
         task = await self.get_task_by_id(task_id)
         
         if task.checker != current_user.id and current_user.role != UserRole.ADMIN:
@@ -216,106 +278,223 @@ class TaskService:
                 detail="You don't have permission to modify this task"
             )
         
-        if not task.photos_metadata:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No photos found in this task"
-            )
-        
-        # Находим и удаляем фото
-        photo_to_delete = None
-        updated_photos = []
+        # Принимаем только объекты из каталогов этой задачи, еще не записанные в нее
+        existing = {
+            self.minio.object_name(meta)
+            for meta in (task.files_metadata or []) + (task.photos_metadata or [])
+        }
+        uploads = [upload for upload in uploads if upload.object_name not in existing]
+        for upload in uploads:
+            if not upload.object_name.startswith(f"tasks/{task.id}/{upload.kind}/") or ".." in upload.object_name:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Object {upload.object_name} does not belong to this task"
+                )
         
-        for photo_meta in task.photos_metadata:
-            if photo_meta.get("name") == photo_name:
-                photo_to_delete = photo_meta
-            else:
-                updated_photos.append(photo_meta)
+        # Проверяем, что объекты действительно загружены
+        stats = await asyncio.gather(
+            *(self.minio.stat_file(upload.object_name) for upload in uploads)
+        )
+        for upload, stat in zip(uploads, stats):
+            if stat is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File {upload.name} was not uploaded"
+                )
+            if upload.kind == "photos" and stat.content_type not in ALLOWED_IMAGE_TYPES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File {upload.name} is not an image"
+                )
         
-        if not photo_to_delete:
+        update_data = {}
+        for kind in ("files", "photos"):
+            new_metadata = [
+                {
+                    "name": upload.name,
+                    "url": self.minio.object_url(upload.object_name),
+                    "object_name": upload.object_name
+                }
+                for upload in uploads if upload.kind == kind
+            ]
+            if new_metadata:
+                column = f"{kind}_metadata"
+                update_data[column] = self.task_repo.jsonb_append(column, new_metadata)
+        
+        if not update_data:
+            return task
+        updated = await self.task_repo.update_where(task_id, update_data)
+        if updated is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Photo '{photo_name}' not found in task"
+                detail="Task not found"
+            )
+        _task_cache.pop(task_id)
+        return updated
+    
+    # Вспомогательные методы
+    async def _delete_attachment(
+        self,
+        task_id: int,
+        column: str,
+        name: str,
+        current_user: User
+    ) -> Task:
+        """Удалить файл или фото: права, поиск и удаление из JSONB - один UPDATE"""
+        removed = await self.task_repo.remove_metadata_entry(
+            task_id, column, name, current_user.id, current_user.role == UserRole.ADMIN
+        )
+        if removed is None:
+            label = "File" if column == "files_metadata" else "Photo"
+            await self._raise_not_found_or_forbidden(
+                task_id,
+                current_user,
+                "You don't have permission to modify this task",
+                HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"{label} '{name}' not found in task"
+                )
             )
+        task, file_meta = removed
+        _task_cache.pop(task_id)
         
         # Удаляем из MinIO
-        await self._delete_file_from_minio(photo_to_delete)
-        
-        return await self.task_repo.update(task_id, {"photos_metadata": updated_photos})
+        await self._delete_file_from_minio(file_meta)
+        return task
     
-    # Вспомогательные методы
-    async def _upload_files(
+    async def _raise_not_found_or_forbidden(
+        self,
+        task_id: int,
+        current_user: User,
+        forbidden_detail: str,
+        not_found: Optional[HTTPException] = None
+    ) -> NoReturn:
+        """Объяснить, почему запрос с проверкой прав не затронул строку.
+
+        Дополнительный SELECT выполняется только на пути ошибки.
+        """
+        task = await self.get_task_by_id(task_id)
+        if task.checker != current_user.id and current_user.role != UserRole.ADMIN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=forbidden_detail
+            )
+        raise not_found or HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    async def _process_uploads(
+        self,
+        task_id: int,
+        files: List[UploadFile],
+        photos: List[UploadFile]
+    ) -> None:
+        """Фоновая загрузка файлов созданной задачи.
+
+        Сессия запроса к этому моменту уже закрыта, поэтому запись идет
+        через отдельную сессию. При любой ошибке задача получает статус
+        FAILED, а загруженные объекты удаляются. files и photos - копии
+        из detach_uploads, они закрываются здесь.
+        """
+        try:
+            await self._store_uploads(task_id, files, photos)
+        finally:
+            for file in files + photos:
+                await file.close()
+    
+    async def _store_uploads(
         self,
         task_id: int,
         files: List[UploadFile],
+        photos: List[UploadFile]
+    ) -> None:
+        """Загрузить файлы в MinIO и записать итог в задачу."""
+        try:
+            # При ошибке gather_attachments сам удаляет уже загруженное
+            files_metadata, photos_metadata = await self.minio.gather_attachments(
+                self._upload_files(task_id, files, "files"),
+                self._upload_photos(task_id, photos)
+            )
+        except Exception as e:
+            print(f"Failed to upload files of task {task_id}: {e}")
+            await self._save_upload_result(task_id, None)
+            return
+        
+        uploaded = files_metadata + photos_metadata
+        try:
+            updated = await self._save_upload_result(task_id, (files_metadata, photos_metadata))
+        except Exception as e:
+            print(f"Failed to save files of task {task_id}: {e}")
+            updated = None
+            await self._save_upload_result(task_id, None)
+        
+        # Задачу удалили во время загрузки, либо запись не удалась
+        if updated is None:
+            await self.minio.delete_attachments(uploaded)
+    
+    async def _save_upload_result(
+        self,
+        task_id: int,
+        metadata: Optional[tuple[List[dict], List[dict]]]
+    ) -> Optional[Task]:
+        """Записать итог фоновой загрузки в отдельной сессии.
+
+        Без metadata задача помечается FAILED; ошибка этой записи только
+        логируется, чтобы не мешать очистке загрузок.
+        """
+        try:
+            async for session in sessionmanager.get_session():
+                task_repo = TaskRepository(session)
+                if metadata is None:
+                    data = {"upload_status": UploadStatus.FAILED}
+                else:
+                    files_metadata, photos_metadata = metadata
+                    data = {
+                        "files_metadata": task_repo.jsonb_append("files_metadata", files_metadata),
+                        "photos_metadata": task_repo.jsonb_append("photos_metadata", photos_metadata),
+                        "upload_status": UploadStatus.READY
+                    }
+                updated = await task_repo.update_where(task_id, data)
+        except Exception as e:
+            if metadata is not None:
+                raise
+            print(f"Failed to mark task {task_id} as FAILED: {e}")
+            return None
+        finally:
+            _task_cache.pop(task_id)
+        return updated
+    
+    async def _upload_files(
+        self,
+        task_key: int | str,
+        files: List[UploadFile],
         folder: str
     ) -> List[dict]:
         """Загрузить файлы в MinIO"""
-        files_metadata = []
-        for file in files:
-            file_id = str(uuid.uuid4())
-            extension = file.filename.split('.')[-1] if file.filename and '.' in file.filename else ''
-            object_name = f"tasks/{task_id}/{folder}/{file_id}.{extension}" if extension else f"tasks/{task_id}/{folder}/{file_id}"
-            
-            file_url = await self.minio.upload_file(file, object_name)
-            files_metadata.append({
-                "name": file.filename,
-                "url": file_url
-            })
-        return files_metadata
+        return await self.minio.upload_attachments(f"tasks/{task_key}/{folder}", files)
     
     async def _upload_photos(
         self,
-        task_id: int,
+        task_key: int | str,
         photos: List[UploadFile]
     ) -> List[dict]:
         """Загрузить фото в MinIO"""
-        allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-        photos_metadata = []
-        
-        for photo in photos:
-            if photo.content_type not in allowed_types:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File {photo.filename} is not an image"
-                )
-            
-            file_id = str(uuid.uuid4())
-            extension = photo.filename.split('.')[-1] if photo.filename and '.' in photo.filename else 'jpg'
-            object_name = f"tasks/{task_id}/photos/{file_id}.{extension}"
-            
-            photo_url = await self.minio.upload_file(photo, object_name)
-            photos_metadata.append({
-                "name": photo.filename,
-                "url": photo_url
-            })
-        
-        return photos_metadata
+        self.minio.validate_images(photos)
+        return await self.minio.upload_attachments(f"tasks/{task_key}/photos", photos, "jpg")
     
     async def _delete_task_files(self, task: Task) -> None:
         """Удалить все файлы задачи из MinIO"""
-        if task.files_metadata:
-            for file_meta in task.files_metadata:
-                try:
-                    await self._delete_file_from_minio(file_meta)
-                except Exception as e:
-                    print(f"Failed to delete file: {e}")
-        
-        if task.photos_metadata:
-            for photo_meta in task.photos_metadata:
-                try:
-                    await self._delete_file_from_minio(photo_meta)
-                except Exception as e:
-                    print(f"Failed to delete photo: {e}")
+        await self.minio.delete_attachments(
+            (task.files_metadata or []) + (task.photos_metadata or [])
+        )
     
     async def _delete_file_from_minio(self, file_meta: dict) -> None:
         """Удалить файл из MinIO"""
-        url = file_meta.get("url", "")
-        if url:
-            object_name = "/".join(url.split("/")[4:])
+        object_name = self.minio.object_name(file_meta)
+        if object_name:
             await self.minio.delete_file(object_name)
 
-
 def get_task_service(
     task_repo: TaskRepository = Depends(get_task_repo),
     minio: MinioManager = Depends(get_minio)
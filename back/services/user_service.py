@@ -1,15 +1,16 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict
 from fastapi import Depends, HTTPException, status
 
 from ..repo import get_user_repo, UserRepository
 from ..entities.models import User
 from ..entities.schemas import UserCreate, UserBase
 from ..entities.enums import UserRole
-from ..utils import password_checker
+from ..utils import password_checker, invalidate_user_cache
 
 
 class UserService:
     """Сервис для работы с пользователями"""
+    __slots__ = ("user_repo",)
     
     def __init__(self, user_repo: UserRepository):
         self.user_repo = user_repo
@@ -50,25 +51,11 @@ class UserService:
     
     async def create_user(self, user_data: UserCreate) -> User:
         """Создать нового пользователя"""
-        # Проверка уникальности username
-        if user_data.username:
-            existing_user = await self.user_repo.get_by_username(user_data.username)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already exists"
-                )
-        
-        # Проверка уникальности email
-        existing_user = await self.user_repo.get_by_email(user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already exists"
-            )
+        # Проверка уникальности username и email одним запросом
+        await self._check_unique(user_data.username, user_data.email)
         
         # Хешируем пароль
-        hashed_password = password_checker.get_password_hash(user_data.password)
+        hashed_password = await password_checker.get_password_hash_async(user_data.password)
         
         # Подготавливаем данные
         user_dict = user_data.model_dump(exclude={"password"})
@@ -84,24 +71,16 @@ class UserService:
         """Обновить профиль пользователя"""
         update_dict = {}
         
-        # Проверка уникальности username
-        if user_data.username and user_data.username != user.username:
-            existing_user = await self.user_repo.get_by_username(user_data.username)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already exists"
-                )
+        username_changed = bool(user_data.username) and user_data.username != user.username
+        email_changed = user_data.email != user.email
+        await self._check_unique(
+            user_data.username if username_changed else None,
+            user_data.email if email_changed else None,
+            exclude_id=user.id
+        )
+        if username_changed:
             update_dict["username"] = user_data.username
-        
-        # Проверка уникальности email
-        if user_data.email != user.email:
-            existing_user = await self.user_repo.get_by_email(user_data.email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already exists"
-                )
+        if email_changed:
             update_dict["email"] = user_data.email
             update_dict["is_email_verified"] = False
         
@@ -109,7 +88,9 @@ class UserService:
             update_dict["full_name"] = user_data.full_name
         
         if update_dict:
-            return await self.user_repo.update(user.id, update_dict)
+            updated = await self.user_repo.update(user.id, update_dict)
+            invalidate_user_cache()
+            return updated
         
         return user
     
@@ -125,30 +106,15 @@ class UserService:
         is_email_verified: Optional[bool] = None
     ) -> User:
         """Обновить пользователя администратором"""
-        user = await self.get_user_by_id(user_id)
-        
         update_dict = {}
         
-        # Проверка уникальности username
-        if username and username != user.username:
-            existing_user = await self.user_repo.get_by_username(username)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already exists"
-                )
+        # Свои username/email не считаются конфликтом (exclude_id), поэтому
+        # текущие значения читать не нужно
+        await self._check_unique(username, email, exclude_id=user_id)
+        if username:
             update_dict["username"] = username
-        
-        # Проверка уникальности email
-        if email and email != user.email:
-            existing_user = await self.user_repo.get_by_email(email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already exists"
-                )
+        if email:
             update_dict["email"] = email
-        
         if full_name is not None:
             update_dict["full_name"] = full_name
         if role is not None:
@@ -160,9 +126,16 @@ class UserService:
         if is_email_verified is not None:
             update_dict["is_email_verified"] = is_email_verified
         
-        if update_dict:
-            return await self.user_repo.update(user_id, update_dict)
+        if not update_dict:
+            return await self.get_user_by_id(user_id)
         
+        user = await self.user_repo.update_where(user_id, update_dict)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        invalidate_user_cache()
         return user
     
     async def change_password(
@@ -178,14 +151,15 @@ class UserService:
                 detail="Cannot change password for OAuth users"
             )
         
-        if not password_checker.verify_password(old_password, user.hashed_password):
+        if not await password_checker.verify_password_async(old_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect old password"
             )
         
-        new_hashed_password = password_checker.get_password_hash(new_password)
+        new_hashed_password = await password_checker.get_password_hash_async(new_password)
         await self.user_repo.update(user.id, {"hashed_password": new_hashed_password})
+        invalidate_user_cache()
         
         return {"message": "Password successfully changed"}
     
@@ -195,34 +169,67 @@ class UserService:
         new_password: str
     ) -> Dict[str, str]:
         """Сбросить пароль пользователя (admin)"""
-        user = await self.get_user_by_id(user_id)
-        
-        if not user.hashed_password:
+        new_hashed_password = await password_checker.get_password_hash_async(new_password)
+        
+        # OAuth-пользователей (без пароля) UPDATE не затрагивает
+        user = await self.user_repo.update_where(
+            user_id,
+            {"hashed_password": new_hashed_password},
+            User.hashed_password.is_not(None)
+        )
+        if not user:
+            # Строка не обновлена: пользователя нет или он OAuth
+            await self.get_user_by_id(user_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot reset password for OAuth users"
             )
-        
-        new_hashed_password = password_checker.get_password_hash(new_password)
-        await self.user_repo.update(user_id, {"hashed_password": new_hashed_password})
+        invalidate_user_cache()
         
         return {"message": f"Password for user {user.username} successfully reset"}
     
     async def delete_user(self, user_id: int) -> None:
-        """Удалить пользователя"""
-        user = await self.get_user_by_id(user_id)
-        await self.user_repo.delete(user_id)
+        """Удалить пользователя (один DELETE ... RETURNING)"""
+        if not await self.user_repo.delete_where(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        invalidate_user_cache()
     
     async def delete_own_account(self, user: User, password: str) -> None:
         """Удалить свой аккаунт"""
         if user.hashed_password:
-            if not password_checker.verify_password(password, user.hashed_password):
+            if not await password_checker.verify_password_async(password, user.hashed_password):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Incorrect password"
                 )
         
         await self.user_repo.delete(user.id)
+        invalidate_user_cache()
+    
+    # Вспомогательные методы
+    async def _check_unique(
+        self,
+        username: Optional[str],
+        email: Optional[str],
+        exclude_id: Optional[int] = None
+    ) -> None:
+        """Проверить, что username и email не заняты другими пользователями"""
+        username_taken, email_taken = await self.user_repo.find_conflicts(
+            username, email, exclude_id
+        )
+        if username_taken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already exists"
+            )
+        if email_taken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already exists"
+            )
 
 
 def get_user_service(
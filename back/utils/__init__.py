@@ -1,21 +1,29 @@
 from .settings import settings
+from .ttl_cache import TTLCache
+from .ids import uuid7, uuid7_hex
 from .password import password_checker
 from .sessionmanager import get_db, Base, sessionmanager
-from .jwt import create_access_token, get_current_user, get_current_active_user, require_roles
-from .minio_manager import minio_manager, get_minio, MinioManager
+from .jwt import create_access_token, get_current_user, get_current_active_user, require_roles, invalidate_user_cache
+from .minio_manager import minio_manager, get_minio, MinioManager, ALLOWED_IMAGE_TYPES
+from .upload_limit import UploadLimitMiddleware
 
 __all__ = [
-    'authenticate_user',
     'settings',
     'password_checker',
     'get_db',
     'create_access_token',
     'get_current_user',
     'get_current_active_user',
+    'invalidate_user_cache',
     'Base',
     'sessionmanager',
     'require_roles',
     'minio_manager',
     'get_minio',
-    'MinioManager'
+    'MinioManager',
+    'ALLOWED_IMAGE_TYPES',
+    'UploadLimitMiddleware',
+    'TTLCache',
+    'uuid7',
+    'uuid7_hex'
 ]
\ No newline at end of file
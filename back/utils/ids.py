@@ -0,0 +1,23 @@
+import os
+import time
+import uuid
+
+
+def _uuid7_int() -> int:
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    return value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID version 7 (RFC 9562).
+
+    48-bit Unix time in milliseconds followed by random bits, so keys
+    generated later sort after earlier ones.
+    """
+    return uuid.UUID(int=_uuid7_int())
+
+
+def uuid7_hex() -> str:
+    """uuid7() as 32 hex digits, without building a UUID object."""
+    return f"{_uuid7_int():032x}"
@@ -9,6 +9,7 @@ from jwt.exceptions import InvalidTokenError
 
 from ..entities.schemas import TokenData
 from ..utils import settings
+from .ttl_cache import TTLCache
 from ..repo import get_user_repo
 from ..entities.enums import UserRole
 
@@ -18,38 +19,53 @@ from ..entities.enums import UserRole
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Ключ подписи кодируется один раз, а не при каждой выдаче/проверке токена
+_SIGNING_KEY = SECRET_KEY.encode("utf-8")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# Пользователи по токену: повторные запросы с тем же токеном не ходят в БД.
+# Запись живет не дольше CURRENT_USER_CACHE_TTL и не дольше самого токена;
+# изменения пользователей сбрасывают кэш целиком (invalidate_user_cache).
+CURRENT_USER_CACHE_SIZE = 10000
+CURRENT_USER_CACHE_TTL = 30
+
+_user_cache: TTLCache = TTLCache(CURRENT_USER_CACHE_SIZE, CURRENT_USER_CACHE_TTL)
+
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
-    """Создание JWT токена"""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=30)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    """Создание JWT токена (по умолчанию на ACCESS_TOKEN_EXPIRE_MINUTES)"""
+    expire = datetime.now(timezone.utc) + (expires_delta or ACCESS_TOKEN_EXPIRE)
+    return jwt.encode({**data, "exp": expire}, _SIGNING_KEY, algorithm=ALGORITHM)
 
 
-def decode_access_token(token: str) -> TokenData:
-    """Декодирование и валидация токена"""
+def _decode_payload(token: str) -> dict:
+    """Проверка подписи и срока токена, возвращает payload"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        user_role: str = payload.get("user_role")
-        if username is None:
-            raise credentials_exception
-        return TokenData(username=username, user_role=user_role)
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
     except InvalidTokenError:
         raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+
+def decode_access_token(token: str) -> TokenData:
+    """Декодирование и валидация токена"""
+    payload = _decode_payload(token)
+    return TokenData(username=payload["sub"], user_role=payload.get("user_role"))
+
+
+def invalidate_user_cache() -> None:
+    """Сбросить кэш пользователей по токенам (после изменения пользователя)"""
+    _user_cache.clear()
 
 
 async def get_current_user(
@@ -57,14 +73,25 @@ async def get_current_user(
     user_repo: Annotated[..., Depends(get_user_repo)]
 ):
     """Получение текущего пользователя из токена"""
-    token_data = decode_access_token(token)
-    user = await user_repo.get_by_username(username=token_data.username)
+    user = _user_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = _decode_payload(token)
+    user = await user_repo.get_by_username(username=payload["sub"])
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Пользователь отвязывается от сессии запроса: иначе rollback в этом
+    # запросе экспайрит объект, который из кэша получат следующие запросы
+    user_repo.session.expunge(user)
+
+    ttl = min(CURRENT_USER_CACHE_TTL, payload.get("exp", 0) - datetime.now(timezone.utc).timestamp())
+    if ttl > 0:
+        _user_cache.set(token, user, ttl)
     return user
 
 
@@ -1,13 +1,39 @@
 from __future__ import annotations
 
-from typing import Optional, BinaryIO
+from typing import Awaitable, Optional
 from datetime import timedelta
+import asyncio
 import io
+import os
+import ssl
+from tempfile import SpooledTemporaryFile
 
+import certifi
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp_retry import ExponentialRetry, RetryClient
 from miniopy_async import Minio
+from miniopy_async.deleteobjects import DeleteObject
+from miniopy_async.datatypes import Object
 from fastapi import UploadFile, HTTPException, status
 
 from . import settings
+from .ids import uuid7_hex
+
+
+# Max concurrent uploads per batch
+UPLOAD_CONCURRENCY = 8
+# Part size for multipart uploads (unknown length or larger than one part).
+# Each part is one read from Starlette's spooled temp file and one PUT.
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+# Parts of a single object uploaded in parallel
+MULTIPART_PARALLEL_PARTS = 4
+# Keep-alive pool size: every in-flight request (MINIO_CONCURRENCY) may run
+# MULTIPART_PARALLEL_PARTS part uploads at once. miniopy's default pool is 10.
+MINIO_POOL_SIZE = settings.MINIO_CONCURRENCY * MULTIPART_PARALLEL_PARTS
+# Content types accepted for photo attachments
+ALLOWED_IMAGE_TYPES = frozenset({"image/jpeg", "image/png", "image/gif", "image/webp"})
+# In-memory size of detached upload copies before they roll to disk (Starlette's default)
+DETACHED_SPOOL_SIZE = 1024 * 1024
 
 
 class MinioManager:
@@ -16,6 +42,31 @@ class MinioManager:
     def __init__(self) -> None:
         self.client: Optional[Minio] = None
         self.bucket_name: str = settings.MINIO_BUCKET_NAME
+        # Bounds in-flight MinIO requests across all concurrent HTTP requests
+        self._semaphore = asyncio.Semaphore(settings.MINIO_CONCURRENCY)
+
+    @staticmethod
+    def _create_session() -> RetryClient:
+        """HTTP session with a connection pool sized for concurrent uploads.
+
+        TLS verification (certifi or SSL_CERT_FILE), timeouts and retries
+        match the session miniopy builds by default.
+        """
+        ssl_context = ssl.create_default_context(
+            cafile=os.environ.get("SSL_CERT_FILE") or certifi.where()
+        )
+        timeout = timedelta(minutes=5).seconds
+        return RetryClient(
+            ClientSession(
+                connector=TCPConnector(
+                    limit=MINIO_POOL_SIZE, keepalive_timeout=60, ssl=ssl_context
+                ),
+                timeout=ClientTimeout(connect=timeout, sock_read=timeout),
+            ),
+            retry_options=ExponentialRetry(
+                attempts=5, factor=0.2, statuses={500, 502, 503, 504}
+            ),
+        )
 
     async def init_minio(self) -> None:
         """Initialize MinIO client and ensure bucket exists."""
@@ -23,7 +74,8 @@ class MinioManager:
             endpoint=f"{settings.MINIO_HOST}:{settings.MINIO_PORT}",
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
+            secure=settings.MINIO_SECURE,
+            session=self._create_session()
         )
 
         # Создаем bucket если его нет
@@ -34,40 +86,75 @@ class MinioManager:
     async def close(self) -> None:
         """Close MinIO client connection."""
         if self.client:
-            # miniopy-async не требует явного закрытия
+            await self.client.close_session()
             self.client = None
 
+    @staticmethod
+    def extension(filename: Optional[str], default: str = "") -> str:
+        """File extension without the dot, or default if there is none."""
+        ext = os.path.splitext(filename or "")[1][1:]
+        return ext or default
+
+    @classmethod
+    def new_object_name(
+        cls,
+        prefix: str,
+        filename: Optional[str],
+        default_extension: str = ""
+    ) -> str:
+        """Unique object name under prefix, keeping the file's extension."""
+        extension = cls.extension(filename, default_extension)
+        name = f"{prefix}/{uuid7_hex()}"
+        return f"{name}.{extension}" if extension else name
+
+    @staticmethod
+    def object_name(file_meta: dict) -> Optional[str]:
+        """Object name from stored file metadata.
+
+        New metadata stores object_name directly; older rows only have the URL.
+        """
+        object_name = file_meta.get("object_name")
+        if object_name:
+            return object_name
+        # Object URL: http://host:port/bucket/<object_name>
+        _, _, rest = (file_meta.get("url") or "").partition("://")
+        _, _, after_host = rest.partition("/")
+        _, _, object_name = after_host.partition("/")
+        return object_name or None
+
+    def object_url(self, object_name: str) -> str:
+        """Public URL stored in file metadata."""
+        return f"http://{settings.MINIO_HOST}:{settings.MINIO_PORT}/{self.bucket_name}/{object_name}"
+
     async def upload_file(
         self,
         file: UploadFile,
         object_name: str,
         content_type: Optional[str] = None
     ) -> str:
-        """Upload file to MinIO."""
+        """Stream file to MinIO without reading it into memory."""
         if not self.client:
             raise RuntimeError("MinIO client is not initialized.")
 
         try:
-            # Читаем содержимое файла
-            content = await file.read()
-            file_size = len(content)
-            
-            # Определяем content_type
             if content_type is None:
                 content_type = file.content_type or "application/octet-stream"
 
-            # Загружаем файл
-            await self.client.put_object(
-                bucket_name=self.bucket_name,
-                object_name=object_name,
-                data=io.BytesIO(content),
-                length=file_size,
-                content_type=content_type
-            )
-
-            # Возвращаем URL для доступа к файлу
-            file_url = f"http://{settings.MINIO_HOST}:{settings.MINIO_PORT}/{self.bucket_name}/{object_name}"
-            return file_url
+            # UploadFile.read() is async; miniopy-async awaits it part by part
+            await file.seek(0)
+            length = file.size if file.size is not None else -1
+            async with self._semaphore:
+                await self.client.put_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name,
+                    data=file,
+                    length=length,
+                    content_type=content_type,
+                    part_size=MULTIPART_PART_SIZE if length == -1 or length > MULTIPART_PART_SIZE else 0,
+                    num_parallel_uploads=MULTIPART_PARALLEL_PARTS
+                )
+
+            return self.object_url(object_name)
 
         except Exception as e:
             raise HTTPException(
@@ -75,7 +162,123 @@ class MinioManager:
                 detail=f"Failed to upload file: {str(e)}"
             )
         finally:
-            await file.seek(0)  # Сбрасываем позицию файла
+            await file.seek(0)
+
+    async def upload_many(
+        self,
+        uploads: list[tuple[UploadFile, str]]
+    ) -> list[str]:
+        """Upload several files concurrently; returns URLs in input order.
+
+        All or nothing: if any upload fails, the ones that succeeded are
+        deleted and the first error is re-raised.
+        """
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+        async def upload(file: UploadFile, object_name: str) -> str:
+            async with semaphore:
+                return await self.upload_file(file, object_name)
+
+        results = await asyncio.gather(
+            *(upload(file, object_name) for file, object_name in uploads),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self._delete_quietly([
+                object_name
+                for (_, object_name), result in zip(uploads, results)
+                if not isinstance(result, BaseException)
+            ])
+            raise errors[0]
+        return results
+
+    @staticmethod
+    def validate_images(photos: list[UploadFile]) -> None:
+        """Reject the batch before any upload if a file is not an image."""
+        for photo in photos:
+            if photo.content_type not in ALLOWED_IMAGE_TYPES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File {photo.filename} is not an image"
+                )
+
+    @staticmethod
+    async def detach_uploads(files: list[UploadFile]) -> list[UploadFile]:
+        """Copy request uploads into files owned by the caller.
+
+        FastAPI closes request UploadFiles once the response is sent, which
+        may happen before a background task reads them. The caller must
+        close the copies.
+        """
+        copies = []
+        try:
+            for file in files:
+                copy = UploadFile(
+                    SpooledTemporaryFile(max_size=DETACHED_SPOOL_SIZE),
+                    size=0,
+                    filename=file.filename,
+                    headers=file.headers
+                )
+                copies.append(copy)
+                await file.seek(0)
+                while chunk := await file.read(MULTIPART_PART_SIZE):
+                    await copy.write(chunk)
+                await copy.seek(0)
+                await file.seek(0)
+        except BaseException:
+            for copy in copies:
+                await copy.close()
+            raise
+        return copies
+
+    async def upload_attachments(
+        self,
+        prefix: str,
+        files: list[UploadFile],
+        default_extension: str = ""
+    ) -> list[dict]:
+        """Upload files under prefix; returns their metadata (name, url, object_name)."""
+        uploads = [
+            (file, self.new_object_name(prefix, file.filename, default_extension))
+            for file in files
+        ]
+        urls = await self.upload_many(uploads)
+        return [
+            {"name": file.filename, "url": url, "object_name": object_name}
+            for (file, object_name), url in zip(uploads, urls)
+        ]
+
+    async def gather_attachments(self, *uploads: Awaitable[list[dict]]) -> list[list[dict]]:
+        """Run several upload_attachments calls concurrently.
+
+        If any of them fails, attachments uploaded by the others are deleted
+        and the first error is re-raised.
+        """
+        results = await asyncio.gather(*uploads, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self.delete_attachments([
+                meta for result in results if not isinstance(result, BaseException) for meta in result
+            ])
+            raise errors[0]
+        return results
+
+    async def delete_attachments(self, metadata: list[dict]) -> None:
+        """Best-effort removal of attachments by their metadata; failures are logged."""
+        await self._delete_quietly([
+            object_name for object_name in map(self.object_name, metadata) if object_name
+        ])
+
+    async def _delete_quietly(self, object_names: list[str]) -> None:
+        """Best-effort removal of objects; failures are logged."""
+        try:
+            failed = await self.delete_files(object_names)
+        except Exception as e:
+            print(f"Failed to delete files: {e}")
+            return
+        for object_name in failed:
+            print(f"Failed to delete file: {object_name}")
 
     async def upload_bytes(
         self,
@@ -90,16 +293,16 @@ class MinioManager:
         try:
             file_size = len(data)
 
-            await self.client.put_object(
-                bucket_name=self.bucket_name,
-                object_name=object_name,
-                data=io.BytesIO(data),
-                length=file_size,
-                content_type=content_type
-            )
+            async with self._semaphore:
+                await self.client.put_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name,
+                    data=io.BytesIO(data),
+                    length=file_size,
+                    content_type=content_type
+                )
 
-            file_url = f"http://{settings.MINIO_HOST}:{settings.MINIO_PORT}/{self.bucket_name}/{object_name}"
-            return file_url
+            return self.object_url(object_name)
 
         except Exception as e:
             raise HTTPException(
@@ -131,10 +334,11 @@ class MinioManager:
             raise RuntimeError("MinIO client is not initialized.")
 
         try:
-            await self.client.remove_object(
-                bucket_name=self.bucket_name,
-                object_name=object_name
-            )
+            async with self._semaphore:
+                await self.client.remove_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name
+                )
             return True
 
         except Exception as e:
@@ -143,6 +347,27 @@ class MinioManager:
                 detail=f"Failed to delete file: {str(e)}"
             )
 
+    async def delete_files(self, object_names: list[str]) -> list[str]:
+        """Delete several files in one request; returns names that failed."""
+        if not self.client:
+            raise RuntimeError("MinIO client is not initialized.")
+        if not object_names:
+            return []
+
+        try:
+            async with self._semaphore:
+                errors = await self.client.remove_objects(
+                    self.bucket_name,
+                    [DeleteObject(name) for name in object_names]
+                )
+            return [error.name for error in errors]
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete files: {str(e)}"
+            )
+
     async def get_presigned_url(
         self,
         object_name: str,
@@ -166,6 +391,42 @@ class MinioManager:
                 detail=f"Failed to generate presigned URL: {str(e)}"
             )
 
+    async def get_presigned_put_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(minutes=15)
+    ) -> str:
+        """Generate a presigned URL the client can PUT the file to directly."""
+        if not self.client:
+            raise RuntimeError("MinIO client is not initialized.")
+
+        try:
+            return await self.client.presigned_put_object(
+                bucket_name=self.bucket_name,
+                object_name=object_name,
+                expires=expires
+            )
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to generate presigned URL: {str(e)}"
+            )
+
+    async def stat_file(self, object_name: str) -> Optional[Object]:
+        """Object metadata (size, content type) or None if it does not exist."""
+        if not self.client:
+            raise RuntimeError("MinIO client is not initialized.")
+
+        try:
+            async with self._semaphore:
+                return await self.client.stat_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name
+                )
+        except Exception:
+            return None
+
     async def file_exists(self, object_name: str) -> bool:
         """Check if file exists in MinIO."""
         if not self.client:
@@ -1,9 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+import asyncio
+import os
+
+from .settings import settings
 
 
 class PasswordChacker:
     def __init__(self):
-        self.password_hash = PasswordHash.recommended()
+        self.password_hash = PasswordHash((
+            Argon2Hasher(
+                time_cost=settings.PASSWORD_TIME_COST,
+                memory_cost=settings.PASSWORD_MEMORY_COST,
+                parallelism=settings.PASSWORD_PARALLELISM,
+            ),
+        ))
+        # argon2 отпускает GIL, поэтому хватает потоков по числу ядер;
+        # отдельный пул не дает хэшированию занять общий пул to_thread.
+        self.executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="password",
+        )
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         return self.password_hash.verify(plain_password, hashed_password)
@@ -11,5 +29,23 @@ class PasswordChacker:
     def get_password_hash(self, password: str) -> str:
         return self.password_hash.hash(password)
 
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return self.password_hash.verify_and_update(plain_password, hashed_password)
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверка пароля в пуле потоков, не блокируя event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.verify_password, plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """Хэширование пароля в пуле потоков, не блокируя event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.get_password_hash, password)
+
+    async def verify_and_update_async(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """Проверка пароля и новый хэш, если старый сделан с устаревшими параметрами."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.verify_and_update, plain_password, hashed_password)
+
 
-password_checker = PasswordChacker()
\ No newline at end of file
+password_checker = PasswordChacker()
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional
 
+import orjson
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -19,6 +20,11 @@ class Base(DeclarativeBase):
     pass
 
 
+def _json_dumps(value: Any) -> str:
+    """JSON/JSONB bind values via orjson (SQLAlchemy expects str)."""
+    return orjson.dumps(value).decode()
+
+
 class SessionManager:
     """Manages asynchronous DB sessions with connection pooling."""
 
@@ -38,9 +44,17 @@ class SessionManager:
             poolclass=AsyncAdaptedQueuePool,
             pool_size=settings.POOL_SIZE,
             max_overflow=settings.MAX_OVERFLOW,
-            pool_pre_ping=False,
+            pool_pre_ping=settings.POOL_PRE_PING,
             pool_recycle=settings.POOL_RECYCLE,
+            pool_timeout=settings.POOL_TIMEOUT,
+            connect_args={
+                "server_settings": {
+                    "tcp_keepalives_idle": str(settings.DB_TCP_KEEPALIVES_IDLE)
+                }
+            },
             echo=settings.DEBUG,
+            json_serializer=_json_dumps,
+            json_deserializer=orjson.loads,
         )
 
         self.session_factory = async_sessionmaker(
@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 
@@ -15,9 +15,19 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
 
-    POOL_SIZE: int = 5
-    MAX_OVERFLOW: int = 10
-    POOL_RECYCLE: int = 3600
+    # Стоимость argon2id: повышается по мере роста мощности сервера.
+    # Старые хэши остаются валидными, параметры хранятся в самом хэше.
+    PASSWORD_TIME_COST: int = 3
+    PASSWORD_MEMORY_COST: int = 65536
+    PASSWORD_PARALLELISM: int = 4
+
+    POOL_SIZE: int = 20
+    MAX_OVERFLOW: int = 40
+    POOL_RECYCLE: int = 1800
+    POOL_PRE_PING: bool = True
+    POOL_TIMEOUT: int = 30
+    # Интервал TCP keepalive на стороне Postgres (секунды)
+    DB_TCP_KEEPALIVES_IDLE: int = 30
     DEBUG: bool = False
     
     OLLAMA_API_KEY: str
@@ -31,11 +41,14 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str
     MINIO_BUCKET_NAME: str = "task-files"
     MINIO_SECURE: bool = False  # True для HTTPS
-
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
+    MINIO_CONCURRENCY: int = 16  # Максимум одновременных запросов к MinIO на процесс
+    MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # Предел multipart-запроса целиком (байты)
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+    )
 
 
 settings = Settings()
\ No newline at end of file
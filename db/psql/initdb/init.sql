@@ -1,6 +1,7 @@
 CREATE TYPE user_role AS ENUM ('STUDENT', 'TEACHER', 'ADMIN');
 CREATE TYPE oauth_provider AS ENUM ('GOOGLE', 'GITHUB', 'LOCAL');
 CREATE TYPE lesson_type AS ENUM ('LECTURE', 'PRACTICE', 'LAB');
+CREATE TYPE upload_status AS ENUM ('PENDING', 'READY', 'FAILED');
 
 
 CREATE TABLE users (
@@ -37,6 +38,7 @@ CREATE TABLE tasks (
     description TEXT NOT NULL, -- В описание можно оставить ссылки на доп материалы
     files_metadata JSONB DEFAULT '[]'::jsonb,
     photos_metadata JSONB DEFAULT '[]'::jsonb,
+    upload_status upload_status NOT NULL DEFAULT 'READY',
 
     lesson_name VARCHAR(255) NOT NULL,
     lesson_type lesson_type NOT NULL,
@@ -48,6 +50,9 @@ CREATE TABLE tasks (
     deadline TIMESTAMP
 );
 
+CREATE INDEX ix_task_specialty_course_deadline ON tasks(specialty, course, deadline);
+CREATE INDEX ix_task_lesson_type_deadline ON tasks(lesson_type, deadline);
+
 INSERT INTO users (email, username, hashed_password, role, is_verified, is_email_verified) 
 VALUES 
 ('admin@example.com', 'admin', '$argon2id$v=19$m=65536,t=3,p=4$gDa6b58Z0M14aO/PAMe4MQ$gjkvtMJH1VjRRHsSRT0ZW6Acxlclo2vv5UjyXhzOiNE', 'ADMIN', TRUE, TRUE),
@@ -95,4 +100,5 @@ CREATE TABLE answers (
 CREATE INDEX idx_answers_task_id ON answers(task_id);
 CREATE INDEX idx_answers_student_id ON answers(student_id);
 CREATE INDEX idx_answers_status ON answers(status);
-CREATE INDEX idx_answers_add_at ON answers(add_at);
\ No newline at end of file
+CREATE INDEX idx_answers_add_at ON answers(add_at);
+CREATE INDEX ix_answer_task_status_addat ON answers(task_id, status, add_at);
\ No newline at end of file